@@ -1,6 +1,6 @@
 {
     'name': 'REST API xRPC CRUD',
-    'version': '18.0.1.1.0',
+    'version': '18.0.1.5.0',
     'summary': 'Generic REST API with API Key Authentication (Odoo 18)',
     'category': 'Tools',
     'author': 'Soulivanh',
@@ -8,6 +8,7 @@
     'depends': ['base', 'web'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/res_users_views.xml',
     ],
     'installable': True,
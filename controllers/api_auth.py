@@ -1,22 +1,98 @@
-from odoo import http, fields
+from odoo import http, fields, api, models
 from odoo.http import request
-from odoo.exceptions import AccessError
+from odoo.exceptions import AccessError, MissingError
+from odoo.tools import SQL
+from psycopg2 import errors as pg_errors
+import base64
+import csv
+import hashlib
+import io
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import secrets
+import threading
+import time
+import werkzeug.exceptions
+import werkzeug.http
+
+from ..tools import metrics, notifications, response_cache, serializer, shared_state, tokens
 
 _logger = logging.getLogger(__name__)
 
+# Number of records read per batch when streaming NDJSON
+STREAM_BATCH_SIZE = 1000
+# Rows fetched per round-trip from the server-side cursor of SQL exports
+EXPORT_BATCH_SIZE = 5000
+# Field types the SQL export can write from their column as is
+EXPORT_FIELD_TYPES = ('boolean', 'char', 'date', 'datetime', 'float', 'html', 'integer', 'many2one',
+                      'many2one_reference', 'monetary', 'selection', 'text')
+# Long-poll subscribers waiting at once in one worker, each holds a connection
+MAX_SUBSCRIBERS = 20
+# Sub-queries accepted by one composite query
+QUERY_MAX_SUBQUERIES = 20
+# Guards on dotted field expansion: nesting depth and related rows read per request
+EXPAND_MAX_DEPTH = 4
+EXPAND_MAX_ROWS = 20000
+# Seconds a database listing is reused by logins before querying the catalog again
+DB_LIST_TTL = 30
+# Database errors left to Odoo, which serves the request again
+RETRIED_ERRORS = (
+    pg_errors.ReadOnlySqlTransaction,
+    pg_errors.SerializationFailure,
+    pg_errors.DeadlockDetected,
+    pg_errors.LockNotAvailable,
+)
+
+_list_dbs_cache = {'expires': 0, 'names': []}
+_subscribers = threading.BoundedSemaphore(MAX_SUBSCRIBERS)
+
+
+def _list_dbs(force=False):
+    """Database names visible to this server, cached for DB_LIST_TTL seconds."""
+    now = time.monotonic()
+    if force or _list_dbs_cache['expires'] <= now:
+        from odoo.service import db as odoo_db
+        _list_dbs_cache['names'] = odoo_db.list_dbs()
+        _list_dbs_cache['expires'] = now + DB_LIST_TTL
+    return _list_dbs_cache['names']
+
+
+def _read_your_writes():
+    """The client asked to see its own latest writes: stay on the primary."""
+    httprequest = request.httprequest
+    value = httprequest.headers.get('X-Read-Your-Writes') or httprequest.args.get('read_your_writes') or ''
+    return value.lower() in ('1', 'true')
+
+
 class ApiAuthController(http.Controller):
 
-    def _json_response(self, data, status=200):
+    # Readonly predicates of the routes, called by Odoo as readonly(controller, rule, args)
+    def _readonly_read(self, rule, args):
+        """Readonly predicate of read-only routes (readonly cursor, on the replica when configured)."""
+        return not _read_your_writes()
+
+    def _readonly_get(self, rule, args):
+        """Readonly predicate of read-write routes: only GET/HEAD go to the readonly cursor."""
+        return (
+            request.httprequest.method in ('GET', 'HEAD')
+            and request.httprequest.args.get('async', '').lower() != 'true'  # queues a job
+            and self._readonly_read(rule, args)
+        )
+
+    def _json_response(self, data, status=200, headers=None):
+        with metrics.request_timer(request).phase('serialize'):
+            body = serializer.dumps(data)
         return request.make_response(
-            json.dumps(data, default=str),
-            headers=[('Content-Type', 'application/json')],
+            body,
+            headers=[('Content-Type', 'application/json')] + (headers or []),
             status=status
         )
 
+    def _get_metadata(self, model):
+        """Cached field metadata of model (see ir.model._rest_api_metadata)."""
+        return model.env['ir.model']._rest_api_metadata(model._name, model.env.lang)
+
     @http.route("/api", type="http", auth="none", methods=["GET"], csrf=False)
     def api_index(self, **kwargs):
         return self._json_response({
@@ -30,10 +106,20 @@ class ApiAuthController(http.Controller):
         _logger.info("REST API: Ping received")
         return self._json_response({"status": "alive", "version": "1.2.3"})
 
+    @http.route("/api/metrics", type="http", auth="api_key", methods=["GET"], csrf=False, readonly=True)
+    def api_metrics(self, **kwargs):
+        """Request metrics of every worker, in the Prometheus text format (admins only)."""
+        if not request.env.user.has_group('base.group_system'):
+            return self._json_response({'error': "Access Denied"}, status=403)
+        return request.make_response(
+            metrics.registry.prometheus(),
+            headers=[('Content-Type', 'text/plain; version=0.0.4')],
+        )
+
     @http.route("/api/login", type="http", auth="none", methods=["POST"], csrf=False)
     def api_login(self, **kwargs):
         """Returns the API Key after successful credentials check."""
-        _logger.info("REST API: Login attempt started")
+        _logger.debug("REST API: Login attempt started")
         try:
             body = json.loads(request.httprequest.data)
         except Exception:
@@ -44,20 +130,23 @@ class ApiAuthController(http.Controller):
         password = (data.get("password") or "")
         dbname = (data.get("db") or data.get("db_name") or data.get("database") or "").strip()
         
-        from odoo.service import db as odoo_db
-        available_dbs = odoo_db.list_dbs()
-
-        # 1. Provide specific error if user input a typo
-        if dbname and dbname not in available_dbs:
-            _logger.warning("REST API: Login failed - Database '%s' does not exist", dbname)
-            return self._json_response({
-                "error": "Invalid database name",
-                "message": f"Database '{dbname}' was not found on this server.",
-                "available_databases": available_dbs
-            }, status=400)
+        # A database already bound to this request (dbfilter/session) needs no catalog lookup
+        if dbname and dbname == request.db:
+            dbname = ''
+        elif dbname and dbname not in _list_dbs():
+            # Unknown name: the catalog may have changed since the last listing
+            available_dbs = _list_dbs(force=True)
+            if dbname not in available_dbs:
+                _logger.warning("REST API: Login failed - Database '%s' does not exist", dbname)
+                return self._json_response({
+                    "error": "Invalid database name",
+                    "message": f"Database '{dbname}' was not found on this server.",
+                    "available_databases": available_dbs
+                }, status=400)
 
-        # 2. Auto-select if only one DB exists and none provided
+        # Auto-select if only one DB exists and none provided
         if not dbname and not request.db:
+            available_dbs = _list_dbs()
             if len(available_dbs) == 1:
                 dbname = available_dbs[0]
                 _logger.info("REST API: Auto-selected database '%s'", dbname)
@@ -73,6 +162,8 @@ class ApiAuthController(http.Controller):
             try:
                 request.update_env(user=None)
             except Exception as e:
+                # Most likely dropped since it was listed
+                _list_dbs_cache['expires'] = 0
                 _logger.error("REST API: Failed to bind to database '%s': %s", dbname, str(e))
                 return self._json_response({"error": "Database connection failed"}, status=500)
         
@@ -80,9 +171,9 @@ class ApiAuthController(http.Controller):
             _logger.warning("REST API: Login failed - No database selected")
             return self._json_response({"error": "No database selected."}, status=400)
 
-        _logger.info("REST API: Authenticating user '%s' on database '%s'", login, request.db)
+        _logger.debug("REST API: Authenticating user '%s' on database '%s'", login, request.db)
         User = request.env["res.users"].sudo()
-        target_user = User.search(["|", ("login", "=", login), ("email", "=", login)], limit=1)
+        target_user = User.search_fetch(["|", ("login", "=", login), ("email", "=", login)], ['login'], limit=1)
         
         if not target_user:
             return self._json_response({"error": "User not found"}, status=404)
@@ -92,9 +183,8 @@ class ApiAuthController(http.Controller):
         
         try:
             res = User._login(db=request.db, credential=credential, user_agent_env=user_agent_env)
-            _logger.info("REST API DEBUG: _login result: %s", res)
+            _logger.debug("REST API: _login result: %s", res)
             uid = res.get('uid') if isinstance(res, dict) else res
-            _logger.info("REST API DEBUG: uid: %s", uid)
             
             if not uid:
                 return self._json_response({"error": "Invalid credentials"}, status=401)
@@ -106,24 +196,22 @@ class ApiAuthController(http.Controller):
                  _logger.error("REST API ERROR: _login returned a list of UIDs: %s", uid)
                  return self._json_response({"error": "Authentication Error", "message": "Multiple users returned."}, status=500)
 
-            # Authentication successful -> bind environment to this user
-            request.update_env(user=uid)
-            
-            # Now request.env.user is the authenticated user
-            user = request.env.user
-            _logger.info("REST API DEBUG: user recordset: %s, ids: %s", user, user.ids)
+            # The response only needs the user's own record: no need to rebind the request env
+            user = User.browse(uid)
+            user.fetch(['name', 'rest_api_key'])
             
             if not user.rest_api_key:
-                _logger.info("REST API DEBUG: Generating API key (inline) for user %s", user.id)
+                _logger.info("REST API: Generating API key for user %s", user.id)
                 try:
-                    # Inline generation to avoid method dispatch issues
-                    new_key = secrets.token_hex(32)
-                    # Use sudo() to write to readonly field and bypass hr check
-                    user.sudo().write({'rest_api_key': new_key})
+                    user.write({'rest_api_key': secrets.token_hex(32)})
                 except Exception as e:
                      _logger.exception("REST API ERROR: Failed to generate/write API key.")
                      return self._json_response({"error": "Key Generation Failed", "message": str(e)}, status=500)
             
+            # Token mode: a short-lived signed token instead of the long-lived key
+            if str(data.get("token", "")).lower() == "true":
+                return self._json_response(dict(self._issue_token(user), uid=user.id, name=user.name))
+
             return self._json_response({
                 "uid": user.id,
                 "name": user.name,
@@ -133,18 +221,38 @@ class ApiAuthController(http.Controller):
             _logger.exception("REST API LOGIN EXCEPTION")
             return self._json_response({"error": "Authentication failed", "message": str(e)}, status=401)
 
+    @http.route("/api/token/refresh", type="http", auth="api_key", methods=["POST"], csrf=False)
+    def api_token_refresh(self, **kwargs):
+        """Issues a new access token, authenticated by an API key or a still valid token."""
+        return self._json_response(self._issue_token(request.env.user))
+
+    def _issue_token(self, user):
+        ttl = int(request.env['ir.config_parameter'].sudo().get_param('rest_api.token_ttl', 900))
+        token, payload = tokens.issue(user, ttl)
+        return {
+            "access_token": token,
+            "token_type": "Bearer",
+            "expires_in": ttl,
+            "expires_at": payload['exp'],
+        }
+
     @http.route("/api/logout", type="http", auth="none", methods=["POST", "GET"], csrf=False)
     def api_logout(self, **kwargs):
-        """Clears the current session."""
+        """Clears the current session, and revokes the access token sent, if any."""
         _logger.info("REST API: Logout requested")
         try:
+            key = request.env['ir.http']._extract_api_key() if request.db else None
+            if key and tokens.is_token(key):
+                payload = tokens.decode(request.env, key)
+                if payload:
+                    tokens.revoke(request.env, payload)
             request.session.logout()
             return self._json_response({"status": "success", "message": "Logged out successfully"})
         except Exception as e:
             return self._json_response({"error": "Logout failed", "message": str(e)}, status=500)
 
-    def _transform_binary_to_url(self, model, records_data):
-        """Replaces Base64 binary data with a short web URL."""
+    def _transform_binary_to_url(self, model, records_data, base_url=None):
+        """Replaces Base64 binary data with the URL of the API binary endpoint."""
         if not records_data:
             return records_data
             
@@ -153,13 +261,12 @@ class ApiAuthController(http.Controller):
         data = [records_data] if is_single else records_data
         
         # Identify binary fields
-        fields_info = model.fields_get()
-        binary_fields = [f for f, info in fields_info.items() if info.get('type') == 'binary']
+        binary_fields = self._get_metadata(model)['binary_fields']
         
         if not binary_fields:
             return records_data
             
-        base_url = request.httprequest.url_root.rstrip('/')
+        base_url = base_url or request.httprequest.url_root.rstrip('/')
         model_name = model._name
         
         for row in data:
@@ -168,142 +275,454 @@ class ApiAuthController(http.Controller):
             for field in binary_fields:
                 if field in row and row[field]:
                     # Shorten binary data to a predictable Odoo URL
-                    row[field] = f"{base_url}/web/image/{model_name}/{rec_id}/{field}"
+                    row[field] = f"{base_url}/api/v1/{model_name}/{rec_id}/{field}"
         
         return data[0] if is_single else data
 
-    def _expand_relations(self, model, records_data, nested_fields):
+    def _read_params(self):
+        """Query params merged with the JSON body params, if any."""
+        params = request.params.copy()
+        try:
+            if request.httprequest.data:
+                body_params = json.loads(request.httprequest.data)
+                if isinstance(body_params, dict):
+                    params.update(body_params)
+        except Exception:
+            pass  # Ignore invalid JSON in body for GET, stick to params
+        return params
+
+    def _prepare_domain(self, Model, params):
+        """
+        Builds the search domain from the 'domain' param, with "me" /
+        "current_user" values and the is_active / active param resolved.
+        Returns (Model, domain), Model may carry an updated context.
+        """
+        domain = params.get('domain', [])
+        if isinstance(domain, str):
+            domain = json.loads(domain)
+
+        # SUPPORT FOR DYNAMIC VALUES like "me"
+        # We iterate and replace "me" with the current user's ID
+        new_domain = []
+        for leaf in domain:
+            if isinstance(leaf, (list, tuple)) and len(leaf) == 3:
+                field, op, val = leaf
+                if val == 'me' or val == 'current_user':
+                    val = request.env.user.id
+                new_domain.append((field, op, val))
+            else:
+                new_domain.append(leaf)
+        domain = new_domain
+
+        # is_active support (Allow 'is_active' OR 'active')
+        is_active_param = params.get('is_active')
+        if is_active_param is None:
+            is_active_param = params.get('active')
+
+        if is_active_param is not None:
+            is_active = str(is_active_param).lower() == 'true'
+            # Remove any existing 'active' term from domain to avoid conflict
+            domain = [d for d in domain if d[0] != 'active']
+            domain.append(('active', '=', is_active))
+
+            # If searching for inactive, OR if we just want to control it explicitly,
+            # set active_test=False so we can find nothing or everything as requested.
+            # If we leave active_test=True, Odoo might force [('active','=',True)] logic 
+            # which conflicts with [('active','=',False)].
+            Model = Model.with_context(active_test=False)
+
+        return Model, domain
+
+    def _parse_fields(self, raw_fields):
+        """
+        Splits a 'fields' param into the fields to read and the dotted ones to expand.
+        Returns (fields_list, nested_fields) where nested_fields is
+        { 'root': ['sub1', 'sub.sub2'] }; an empty fields_list means read all.
+        """
+        if isinstance(raw_fields, str):
+            raw_fields = json.loads(raw_fields)
+
+        fields_to_read = set()
+        nested_fields = {}
+        for f in raw_fields or []:
+            root, _, rest = f.partition('.')
+            fields_to_read.add(root)
+            if rest:
+                nested_fields.setdefault(root, []).append(rest)
+        return list(fields_to_read), nested_fields
+
+    def _list_fields(self, Model, fields_list, params):
+        """
+        Fields read by list reads. When no field is asked for, binary fields
+        are left out (fetch them from the binary endpoint) unless the
+        'include_binary' param is true.
+        """
+        if fields_list or str(params.get('include_binary', '')).lower() == 'true':
+            return fields_list
+        binary_fields = set(self._get_metadata(Model)['binary_fields'])
+        return [name for name in Model.check_field_access_rights('read', None) if name not in binary_fields]
+
+    def _parse_many2one(self, params):
+        """'many2one' shape of many2one values: pair ([id, name], default), id or object."""
+        many2one = params.get('many2one') or 'pair'
+        if many2one not in serializer.MANY2ONE_SHAPES:
+            raise werkzeug.exceptions.BadRequest(f"Invalid many2one, use {', '.join(serializer.MANY2ONE_SHAPES)}")
+        return many2one
+
+    def _convert_rows(self, model, rows, fields_list, nested_fields=None, many2one='pair'):
+        """
+        Converts rows read with fields_list to JSON-native values, using a
+        converter compiled once per field set (see tools/serializer.py).
+        Expanded fields are left alone, their rows are converted on their own.
+        """
+        types = self._get_metadata(model)['types']
+        nested_fields = nested_fields or {}
+        field_types = tuple(sorted(
+            (name, types[name]) for name in (fields_list or types) if name in types and name not in nested_fields
+        ))
+        converter = serializer.row_converter(field_types, many2one)
+        return converter(rows) if converter else rows
+
+    def _parse_expand_limit(self, params):
+        """'expand_limit' is either an int for every x2many or { 'dotted.path': int }."""
+        expand_limit = params.get('expand_limit')
+        if isinstance(expand_limit, str):
+            expand_limit = json.loads(expand_limit)
+        return expand_limit
+
+    def _expand_relations(self, model, records_data, nested_fields, base_url=None, expand_limit=None, many2one='pair'):
         """
         Expands related fields for dotted notation requests.
         records_data: list of dictionaries
         nested_fields: dict { 'root_field': ['sub_field1', 'sub.sub.field'] }
+        expand_limit: max related rows kept per x2many (see _parse_expand_limit)
+        many2one: shape of the many2one values of related rows (see _parse_many2one)
+
+        The whole tree is planned depth by depth: relations of the same depth
+        that target the same comodel with the same sub-fields are merged, so
+        each (model, fields) pair costs one read of deduplicated ids.
         """
         if not records_data or not nested_fields:
             return records_data
 
-        fields_info = model.fields_get(list(nested_fields.keys()))
-        
-        for root_field, sub_fields in nested_fields.items():
-            if root_field not in fields_info:
-                continue
-                
-            field_type = fields_info[root_field]['type']
-            relation = fields_info[root_field].get('relation')
-            if not relation:
-                continue
-            
-            RelModel = request.env[relation] # REMOVED .sudo() to enforce Access Rights
-            
-            # 1. Collect all related IDs
-            related_ids = set()
-            for row in records_data:
-                val = row.get(root_field)
-                if not val:
-                    continue
-                if isinstance(val, tuple): # Many2one (id, name)
-                    related_ids.add(val[0])
-                elif isinstance(val, list): # x2many [id1, id2]
-                    related_ids.update(val)
-                elif isinstance(val, int): # standard ID
-                    related_ids.add(val)
-            
-            if not related_ids:
-                continue
-                
-            # 2. Recursive expand (handle multiple levels of nesting if needed)
-            # For now, let's process the immediate children.
-            # Split sub_fields into direct children and their nested children
-            # sub_fields might be ['name', 'child_id.name']
-            
-            direct_sub_fields = set()
-            next_level_nested = {}
-            
-            for f in sub_fields:
-                parts = f.split('.', 1)
-                direct_sub_fields.add(parts[0])
-                if len(parts) > 1:
-                    if parts[0] not in next_level_nested:
-                        next_level_nested[parts[0]] = []
-                    next_level_nested[parts[0]].append(parts[1])
-            
-            # Always ensure 'id' and 'display_name' are fetched unless specific fields are strictly requested? 
-            # Or trust user input. Let's trust user input but add 'id'.
-            if 'id' not in direct_sub_fields:
-                direct_sub_fields.add('id')
-                
-            # 3. Fetch related records
-            # Note: We recursivley call ourselves to handle deep nesting
-            rel_records = RelModel.browse(list(related_ids))
-            rel_data_raw = rel_records.read(list(direct_sub_fields))
-            
-            # Transform binary if needed (optional, could be recursive, but let's stick to simple first)
-            rel_data_raw = self._transform_binary_to_url(RelModel, rel_data_raw)
-            if isinstance(rel_data_raw, dict): rel_data_raw = [rel_data_raw]
+        # Expansions pending at the current depth: (model, rows, nested, path prefixes)
+        level = [(model, records_data, nested_fields, ('',))]
+        depth = 0
+        rows_read = 0
+        while level:
+            depth += 1
+            if depth > EXPAND_MAX_DEPTH:
+                raise werkzeug.exceptions.BadRequest(f"Relations can be expanded {EXPAND_MAX_DEPTH} levels deep at most")
+
+            # 1. Plan: group every relation of this depth by (comodel, sub-fields)
+            groups = {}
+            for parent_model, rows, nested, prefixes in level:
+                metadata = self._get_metadata(parent_model)
+                for root_field, sub_fields in nested.items():
+                    relation = metadata['relations'].get(root_field)
+                    if not relation:
+                        continue
+                    field_type = metadata['types'][root_field]
+                    paths = tuple(prefix + root_field for prefix in prefixes)
+                    limit = None
+                    if isinstance(expand_limit, dict):
+                        limits = [expand_limit[p] for p in paths if p in expand_limit]
+                        limit = min(limits) if limits else None
+                    elif expand_limit:
+                        limit = expand_limit
+
+                    group = groups.setdefault((relation, tuple(sorted(set(sub_fields)))), {
+                        'ids': {},  # dict as an ordered set
+                        'targets': [],
+                        'prefixes': set(),
+                    })
+                    group['prefixes'].update(path + '.' for path in paths)
+                    for row in rows:
+                        val = row.get(root_field)
+                        if isinstance(val, tuple):  # Many2one (id, name)
+                            val = val[0]
+                        if field_type == 'many2one':
+                            if val:
+                                group['ids'][val] = None
+                        else:
+                            val = list(val or [])
+                            if limit is not None:
+                                val = val[:int(limit)]
+                            group['ids'].update(dict.fromkeys(val))
+                        group['targets'].append((row, root_field, field_type, val))
+
+            # 2. Fetch: one read per (comodel, sub-fields), then graft the results
+            next_level = []
+            for (relation, sub_fields), group in groups.items():
+                rows_read += len(group['ids'])
+                if rows_read > EXPAND_MAX_ROWS:
+                    raise werkzeug.exceptions.BadRequest(f"Relation expansion would read more than {EXPAND_MAX_ROWS} rows")
+
+                direct_fields, deeper = self._parse_fields(sub_fields)
+                RelModel = model.env[relation] # No .sudo() to enforce Access Rights
+                rel_rows = []
+                if group['ids']:
+                    rel_rows = RelModel.browse(list(group['ids'])).read(list(set(direct_fields) | {'id'}))
+                    rel_rows = self._transform_binary_to_url(RelModel, rel_rows, base_url=base_url)
+                    rel_rows = self._convert_rows(RelModel, rel_rows, direct_fields, deeper, many2one)
+                rel_map = {r['id']: r for r in rel_rows}
+
+                for row, root_field, field_type, val in group['targets']:
+                    if field_type == 'many2one':
+                        row[root_field] = rel_map.get(val) if val else None
+                    else:
+                        row[root_field] = [rel_map[i] for i in val if i in rel_map]
+
+                if deeper and rel_rows:
+                    next_level.append((RelModel, rel_rows, deeper, tuple(sorted(group['prefixes']))))
+            level = next_level
 
-            # Recurse if there are deeper levels
-            if next_level_nested:
-                rel_data_raw = self._expand_relations(RelModel, rel_data_raw, next_level_nested)
-            
-            # Index by ID
-            rel_map = {r['id']: r for r in rel_data_raw}
-            
-            # 4. Update original data
-            for row in records_data:
-                val = row.get(root_field)
-                if not val:
-                    row[root_field] = None if field_type == 'many2one' else []
-                    continue
-                    
-                if isinstance(val, tuple): # M2O
-                    row[root_field] = rel_map.get(val[0])
-                elif isinstance(val, int): # M2O as ID
-                    row[root_field] = rel_map.get(val)
-                elif isinstance(val, list): # x2M
-                    # Odoo returns list of IDs
-                    expanded = [rel_map[i] for i in val if i in rel_map]
-                    row[root_field] = expanded
-        
         return records_data
 
+    def _stream_ndjson(self, Model, domain, fields_list, nested_fields, use_image_url, limit=None, expand_limit=None,
+                       many2one='pair'):
+        """
+        Streams the records matching domain as NDJSON (one JSON object per line).
+        Records are read in id batches on a dedicated cursor, so memory stays
+        flat whatever the number of rows; the request cursor is already closed
+        by the time the response body is consumed.
+        """
+        registry = Model.env.registry
+        uid = Model.env.uid
+        context = dict(Model.env.context)
+        model_name = Model._name
+        base_url = request.httprequest.url_root.rstrip('/')
+        readonly = not _read_your_writes()
+
+        def generate():
+            with registry.cursor(readonly=readonly) as cr:
+                env = api.Environment(cr, uid, context)
+                StreamModel = env[model_name]
+                last_id = 0
+                remaining = limit
+                try:
+                    while remaining is None or remaining > 0:
+                        batch_size = STREAM_BATCH_SIZE if remaining is None else min(STREAM_BATCH_SIZE, remaining)
+                        records = StreamModel.search(domain + [('id', '>', last_id)], limit=batch_size, order='id')
+                        if not records:
+                            break
+                        rows = records.read(fields_list)
+                        if use_image_url:
+                            rows = self._transform_binary_to_url(StreamModel, rows, base_url=base_url)
+                        if nested_fields:
+                            rows = self._expand_relations(StreamModel, rows, nested_fields, base_url=base_url,
+                                                          expand_limit=expand_limit, many2one=many2one)
+                        rows = self._convert_rows(StreamModel, rows, fields_list, nested_fields, many2one)
+                        yield b''.join(serializer.dumps(row) + b'\n' for row in rows)
+
+                        last_id = records.ids[-1]
+                        if remaining is not None:
+                            remaining -= len(records)
+                        # Drop the batch from the record cache to keep memory flat
+                        env.invalidate_all()
+                        if len(records) < batch_size:
+                            break
+                except Exception as e:
+                    # Headers are gone already, report the failure as a last line
+                    _logger.exception("REST API: NDJSON stream of %s failed", model_name)
+                    yield serializer.dumps({'error': str(e)}) + b'\n'
+
+        return request.make_response(generate(), headers=[('Content-Type', 'application/x-ndjson')])
+
+    def _check_conditional(self, Model, domain, params, fields_list, nested_fields, single=False):
+        """
+        Conditional GET support. Computes the validators of a read from a
+        single aggregate query (max write_date and count of domain), before
+        any record is read, and matches them against If-None-Match /
+        If-Modified-Since. The payload also carries rows of other models
+        (many2one display names, expanded relations): the last write date of
+        each of them is part of the validators too. The ETag also covers the
+        user, companies, language and request params, as they change the
+        payload.
+        Returns (headers, count, not_modified); count is None when the model
+        has no write_date.
+        """
+        if 'write_date' not in Model._fields:
+            return [], None, False
+        [(last_modified, count)] = Model._read_group(domain, aggregates=['write_date:max', '__count'])
+        related_modified = self._last_write_dates(
+            self._source_models(Model, fields_list, nested_fields) - {Model._name})
+        if related_modified:
+            last_modified = max(filter(None, [last_modified, *related_modified.values()]), default=None)
+
+        key = json.dumps([
+            Model._name, Model.env.uid, Model.env.context.get('allowed_company_ids'),
+            Model.env.lang, params, last_modified, count, related_modified,
+        ], sort_keys=True, default=str)
+        tag = hashlib.sha1(key.encode()).hexdigest()
+        headers = [('ETag', f'W/"{tag}"'), ('Cache-Control', 'private, no-cache')]
+        if last_modified:
+            headers.append(('Last-Modified', werkzeug.http.http_date(last_modified)))
+
+        httpreq = request.httprequest
+        if httpreq.headers.get('If-None-Match'):
+            not_modified = tag in httpreq.headers['If-None-Match']
+        # Deletions do not move max(write_date), so dates only validate single records
+        elif single and last_modified and httpreq.if_modified_since:
+            since = httpreq.if_modified_since.replace(tzinfo=None)
+            not_modified = last_modified.replace(microsecond=0) <= since
+        else:
+            not_modified = False
+        return headers, count, not_modified
+
+    def _last_write_dates(self, model_names):
+        """Last write date of every model of model_names, in one query; only an input of the validators."""
+        tables = sorted(
+            (model_name, request.env[model_name]._table) for model_name in model_names
+            if request.env[model_name]._auto and 'write_date' in request.env[model_name]._fields
+        )
+        if not tables:
+            return {}
+        request.env.flush_all()
+        request.env.cr.execute(SQL("SELECT %s", SQL(", ").join(
+            SQL("(SELECT max(write_date) FROM %s)", SQL.identifier(table)) for _model_name, table in tables
+        )))
+        return dict(zip((model_name for model_name, _table in tables), request.env.cr.fetchone()))
+
+    def _response_cache_key(self, Model, domain, fields_list, nested_fields, params):
+        """
+        Key of a list response in the response cache, and the models its data
+        comes from: the root model, the comodels of the many2one fields read
+        (their display names) and every comodel reached by expansion.
+        """
+        key = json.dumps([
+            request.db, Model._name, domain, sorted(fields_list), nested_fields,
+            {name: value for name, value in params.items() if name not in ('api_key', 'cache', 'domain', 'fields')},
+            Model.env.uid, Model.env.context.get('allowed_company_ids'), Model.env.lang,
+            Model.env.context.get('active_test', True),
+        ], sort_keys=True, default=str)
+        return hashlib.sha1(key.encode()).hexdigest(), sorted(self._source_models(Model, fields_list, nested_fields))
+
+    def _source_models(self, model, fields_list, nested_fields):
+        metadata = self._get_metadata(model)
+        model_names = {model._name}
+        for name in fields_list or metadata['types']:
+            if metadata['types'].get(name) == 'many2one' and name not in nested_fields:
+                model_names.add(metadata['relations'][name])
+        for root_field, sub_fields in nested_fields.items():
+            relation = metadata['relations'].get(root_field)
+            if relation:
+                direct_fields, deeper = self._parse_fields(sub_fields)
+                model_names |= self._source_models(model.env[relation], direct_fields, deeper)
+        return model_names
+
+    def _parse_order(self, Model, order, keyset=False):
+        """
+        Parses an 'order' param ("field" or "field desc") into (field, direction).
+        Keyset pagination only accepts fields that can never be NULL.
+        """
+        if not order:
+            return ('id', 'asc') if keyset else (None, None)
+        parts = str(order).split()
+        field_name = parts[0]
+        direction = parts[1].lower() if len(parts) > 1 else 'asc'
+        if len(parts) > 2 or direction not in ('asc', 'desc'):
+            raise werkzeug.exceptions.BadRequest(f"Invalid order '{order}'")
+        field = Model._fields.get(field_name)
+        if not field or not field.store or field.type in ('one2many', 'many2many', 'binary'):
+            raise werkzeug.exceptions.BadRequest(f"Cannot order by '{field_name}'")
+        if keyset and field.type == 'many2one':
+            raise werkzeug.exceptions.BadRequest(f"Cursor pagination cannot order by relation '{field_name}'")
+        if keyset and not (field.required or field_name in ('id', 'create_date', 'write_date')):
+            raise werkzeug.exceptions.BadRequest(f"Cursor pagination needs a required field, '{field_name}' is optional")
+        return field_name, direction
+
+    def _encode_cursor(self, record, order_field):
+        payload = json.dumps([record[order_field], record.id], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        try:
+            value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception:
+            raise werkzeug.exceptions.BadRequest("Invalid cursor")
+        return value, int(last_id)
+
+    def _cursor_domain(self, order_field, direction, cursor, field_type=None):
+        """Domain selecting the rows that come after the cursor position."""
+        value, last_id = cursor
+        if field_type == 'datetime' and isinstance(value, str):
+            # Keep microseconds: ties on the date are then broken by id only
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise werkzeug.exceptions.BadRequest("Invalid cursor")
+        op = '>' if direction == 'asc' else '<'
+        if order_field == 'id':
+            return [('id', op, last_id)]
+        return ['|', (order_field, op, value), '&', (order_field, '=', value), ('id', op, last_id)]
+
+    def _estimate_count(self, Model, domain):
+        """Row count estimated by the PostgreSQL planner, without scanning the table."""
+        query = Model._search(domain)
+        request.env.cr.execute(SQL("EXPLAIN (FORMAT JSON) %s", query.select()))
+        plan = request.env.cr.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
     @http.route([
         '/api/v1/<string:model_name>/fields',
         '/api/v1/<string:model_name>',
         '/api/v1/<string:model_name>/<int:rec_id>'
-    ], type='http', auth='api_key', methods=['GET', 'POST', 'PUT', 'DELETE'], csrf=False)
+    ], type='http', auth='api_key', methods=['GET', 'POST', 'PUT', 'DELETE'], csrf=False, readonly=_readonly_get)
     def dispatch_rest(self, model_name, rec_id=None, **kwargs):
         """Generic REST Dispatcher using API Key Auth."""
         _logger.info("REST API: Request to %s (%s)", model_name, request.httprequest.method)
         Model = request.env.get(model_name)
         if Model is None:
             return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        timer = metrics.request_timer(request)
+        timer.model = model_name
 
         if request.httprequest.path.endswith('/fields'):
-            return self._json_response(Model.sudo().fields_get())
+            metadata = self._get_metadata(Model)
+            etag = f'"{metadata["etag"]}"'
+            headers = [('ETag', etag), ('Cache-Control', 'private, no-cache')]
+            if etag in request.httprequest.headers.get('If-None-Match', ''):
+                return request.make_response('', headers=headers, status=304)
+            return request.make_response(
+                metadata['fields_json'],
+                headers=[('Content-Type', 'application/json')] + headers,
+            )
 
         method = request.httprequest.method
         try:
+            if str(request.params.get('async', '')).lower() == 'true':
+                return self._queue_job(Model, rec_id, method)
+
             if method == 'GET':
                 # 1. Merge Query Params + JSON Body Params
-                params = request.params.copy()
-                try:
-                    if request.httprequest.data:
-                        body_params = json.loads(request.httprequest.data)
-                        if isinstance(body_params, dict):
-                            params.update(body_params)
-                except Exception:
-                    pass  # Ignore invalid JSON in body for GET, stick to params
-
-                use_image_url = str(params.get('image_url', '')).lower() == 'true'
+                with timer.phase('parse'):
+                    params = self._read_params()
+
+                    use_image_url = str(params.get('image_url', '')).lower() == 'true'
+                    fields_list, nested_fields = self._parse_fields(params.get('fields'))
+                    expand_limit = self._parse_expand_limit(params)
+                    many2one = self._parse_many2one(params)
                 
                 if rec_id:
                     record = Model.browse(rec_id)
                     if not record.exists():
                         return self._json_response({'error': "Not found"}, status=404)
-                    fields_to_read = json.loads(params.get('fields', '[]') if isinstance(params.get('fields'), str) else json.dumps(params.get('fields')))
-                    data = record.read(fields_to_read)[0]
+                    validators, _count, not_modified = self._check_conditional(
+                        Model, [('id', '=', rec_id)], params, fields_list, nested_fields, single=True)
+                    if not_modified:
+                        return request.make_response('', headers=validators, status=304)
+                    with timer.phase('read'):
+                        data = record.read(fields_list)[0]
                     if use_image_url:
-                        data = self._transform_binary_to_url(Model, data)
-                    return self._json_response(data)
+                        with timer.phase('binary'):
+                            data = self._transform_binary_to_url(Model, data)
+                    if nested_fields:
+                        with timer.phase('expand'):
+                            data = self._expand_relations(Model, [data], nested_fields, expand_limit=expand_limit,
+                                                          many2one=many2one)[0]
+                    data = self._convert_rows(Model, [data], fields_list, nested_fields, many2one)[0]
+                    return self._json_response(data, headers=validators)
                 else:
                     # 2. Pagination Logic
                     limit = int(params.get('limit') or params.get('page_size') or 80)
@@ -314,127 +733,134 @@ class ApiAuthController(http.Controller):
                         offset = (page - 1) * limit
 
                     # 3. Filter Logic
-                    domain = params.get('domain', [])
-                    if isinstance(domain, str):
-                        domain = json.loads(domain)
-                    
-                    # SUPPORT FOR DYNAMIC VALUES like "me"
-                    # We iterate and replace "me" with the current user's ID
-                    new_domain = []
-                    for leaf in domain:
-                        if isinstance(leaf, (list, tuple)) and len(leaf) == 3:
-                            field, op, val = leaf
-                            if val == 'me' or val == 'current_user':
-                                val = request.env.user.id
-                            new_domain.append((field, op, val))
-                        else:
-                            new_domain.append(leaf)
-                    domain = new_domain
-                    
-                    # is_active support (Allow 'is_active' OR 'active')
-                    is_active_param = params.get('is_active')
-                    if is_active_param is None:
-                        is_active_param = params.get('active')
-
-                    if is_active_param is not None:
-                        is_active = str(is_active_param).lower() == 'true'
-                        # Remove any existing 'active' term from domain to avoid conflict
-                        domain = [d for d in domain if d[0] != 'active']
-                        domain.append(('active', '=', is_active))
-                        
-                        # If searching for inactive, OR if we just want to control it explicitly,
-                        # set active_test=False so we can find nothing or everything as requested.
-                        # If we leave active_test=True, Odoo might force [('active','=',True)] logic 
-                        # which conflicts with [('active','=',False)].
-                        Model = Model.with_context(active_test=False)
-
-                    # --- Field Parsing for Nested Support ---
-                    raw_fields = params.get('fields', [])
-                    if isinstance(raw_fields, str):
-                        raw_fields = json.loads(raw_fields)
-                    
-                    fields_to_read = set()
-                    nested_fields = {} # { 'root': ['sub1', 'sub2'] }
-                    
-                    if not raw_fields:
-                        # empty fields means read all
-                        pass
-                    else:
-                        for f in raw_fields:
-                            if '.' in f:
-                                parts = f.split('.', 1)
-                                root = parts[0]
-                                fields_to_read.add(root)
-                                fields_to_read.add(root)
-                                if root not in nested_fields:
-                                    nested_fields[root] = []
-                                nested_fields[root].append(parts[1])
-                            else:
-                                fields_to_read.add(f)
-                    
-                    fields_list = list(fields_to_read) if fields_to_read else []
+                    with timer.phase('parse'):
+                        Model, domain = self._prepare_domain(Model, params)
+                        fields_list = self._list_fields(Model, fields_list, params)
+
+                    # Streaming mode: whole result set as NDJSON, read in batches
+                    accept = request.httprequest.headers.get('Accept', '')
+                    if str(params.get('stream', '')).lower() == 'true' or 'application/x-ndjson' in accept:
+                        stream_limit = int(params['limit']) if params.get('limit') else None
+                        return self._stream_ndjson(Model, domain, fields_list, nested_fields, use_image_url,
+                                                   limit=stream_limit, expand_limit=expand_limit, many2one=many2one)
+
+                    # Opt-in response cache, checked before any query
+                    cache_size = int(request.env['ir.config_parameter'].sudo().get_param('rest_api.cache_size', 256))
+                    use_cache = cache_size > 0 and str(params.get('cache', '')).lower() == 'true'
+                    if use_cache:
+                        cache_key, cache_models = self._response_cache_key(Model, domain, fields_list, nested_fields, params)
+                        cached = response_cache.cache.get(cache_key, request.db, cache_models)
+                        if cached:
+                            body, cached_headers = cached
+                            etag = dict(cached_headers).get('ETag')
+                            if_none_match = request.httprequest.headers.get('If-None-Match')
+                            if not if_none_match:
+                                return request.make_response(body, headers=cached_headers)
+                            # The entry is current, so is its ETag
+                            if etag and etag.removeprefix('W/').strip('"') in if_none_match:
+                                return request.make_response('', status=304, headers=[
+                                    (name, value) for name, value in cached_headers
+                                    if name in ('ETag', 'Cache-Control', 'Last-Modified')
+                                ])
+                            if etag:
+                                return request.make_response(body, headers=cached_headers)
+                            # Cached without validators: compute them below
 
-                    total_count = Model.search_count(domain)
-                    records = Model.search(domain, limit=limit, offset=offset)
-                    results = records.read(fields_list)
+                    # 4. Ordering, cursor (keyset) pagination and totals
+                    use_cursor = 'cursor' in params
+                    order_field, direction = self._parse_order(Model, params.get('order'), keyset=use_cursor)
+                    order = f"{order_field} {direction}, id {direction}" if order_field else None
+
+                    total_mode = str(params.get('total') or 'exact').lower()
+                    if total_mode not in ('none', 'estimate', 'exact'):
+                        return self._json_response({'error': "Invalid total, use none, estimate or exact"}, status=400)
+                    # Conditional GET: validators come from one aggregate query, which
+                    # also gives the exact total. Skipped when the client opted out of
+                    # counting, unless the request itself is conditional.
+                    with timer.phase('count'):
+                        validators, total_count = [], None
+                        httpreq = request.httprequest
+                        if total_mode == 'exact' or httpreq.headers.get('If-None-Match'):
+                            validators, total_count, not_modified = self._check_conditional(
+                                Model, domain, params, fields_list, nested_fields)
+                            if not_modified:
+                                return request.make_response('', headers=validators, status=304)
+                            if total_mode != 'exact':
+                                total_count = None
+
+                        if total_mode == 'exact' and total_count is None:
+                            total_count = Model.search_count(domain)
+                        elif total_mode == 'estimate':
+                            total_count = self._estimate_count(Model, domain)
+
+                    next_cursor = None
+                    with timer.phase('search'):
+                        if use_cursor:
+                            search_domain = domain
+                            if params.get('cursor'):
+                                cursor = self._decode_cursor(params['cursor'])
+                                search_domain = domain + self._cursor_domain(
+                                    order_field, direction, cursor, Model._fields[order_field].type)
+                            # Fetch one extra row to know whether another page exists
+                            records = Model.search(search_domain, limit=limit + 1, order=order)
+                            if len(records) > limit:
+                                records = records[:limit]
+                                next_cursor = self._encode_cursor(records[-1], order_field)
+                        else:
+                            records = Model.search(domain, limit=limit, offset=offset, order=order)
+                    with timer.phase('read'):
+                        results = records.read(fields_list)
                     
                     if use_image_url:
-                        results = self._transform_binary_to_url(Model, results)
+                        with timer.phase('binary'):
+                            results = self._transform_binary_to_url(Model, results)
                     
                     # --- Expand Nested Relations ---
                     if nested_fields:
-                         results = self._expand_relations(Model, results, nested_fields)
+                        with timer.phase('expand'):
+                            results = self._expand_relations(Model, results, nested_fields, expand_limit=expand_limit,
+                                                             many2one=many2one)
+                    with timer.phase('serialize'):
+                        results = self._convert_rows(Model, results, fields_list, nested_fields, many2one)
+                    timer.details = {'domain': domain, 'fields': params.get('fields')}
                         
-                    # Calculate total pages
-                    total_pages = (total_count + limit - 1) // limit if limit > 0 else 1
-
-                    return self._json_response({
-                        'count': len(results),
-                        'total': total_count,
-                        'page': page,
-                        'total_pages': total_pages,
-                        'limit': limit,
-                        'offset': offset,
-                        'results': results
-                    })
+                    if use_cursor:
+                        payload = {
+                            'count': len(results),
+                            'total': total_count,
+                            'limit': limit,
+                            'next_cursor': next_cursor,
+                            'results': results
+                        }
+                    else:
+                        # Calculate total pages
+                        total_pages = None
+                        if total_count is not None:
+                            total_pages = (total_count + limit - 1) // limit if limit > 0 else 1
+
+                        payload = {
+                            'count': len(results),
+                            'total': total_count,
+                            'page': page,
+                            'total_pages': total_pages,
+                            'limit': limit,
+                            'offset': offset,
+                            'results': results
+                        }
+
+                    response = self._json_response(payload, headers=validators)
+                    if use_cache:
+                        ttl = int(request.env['ir.config_parameter'].sudo().get_param('rest_api.cache_ttl', 60))
+                        response_cache.cache.put(
+                            cache_key, request.db, timer.started_at, cache_models,
+                            response.get_data(), list(response.headers.items()), ttl, cache_size,
+                        )
+                    return response
             
             elif method == 'POST':
                 body = json.loads(request.httprequest.data)
-                vals = body.get('params', body)
-                
-                # Specialized logic for res.users
-                if model_name == 'res.users':
-                    login = vals.get('login')
-                    email = vals.get('email')
-                    
-                    # 1. Duplication Check
-                    domain = []
-                    if login: domain.append(('login', '=', login))
-                    if email: domain.append(('email', '=', email))
-                    if domain and Model.sudo().search_read(['|'] + domain if len(domain) > 1 else domain, ['id'], limit=1):
-                        return self._json_response({'error': 'Conflict', 'message': 'A user with this login or email already exists.'}, status=409)
-                    
-                    # 2. Password Validation
-                    password = vals.get('password')
-                    confirm_password = vals.get('confirm_password')
-                    if password or confirm_password:
-                        if password != confirm_password:
-                            return self._json_response({'error': 'Bad Request', 'message': 'Passwords do not match.'}, status=400)
-                        # Odoo uses 'password' field for creation
-                        vals.pop('confirm_password', None)
-
-                record = Model.create(vals)
-                
-                # Auto-generate API Key for new users
-                if model_name == 'res.users':
-                    record.action_generate_api_key()
-                    return self._json_response({
-                        'id': record.id, 
-                        'display_name': record.display_name,
-                        'api_key': record.rest_api_key
-                    }, status=201)
-
-                return self._json_response({'id': record.id, 'display_name': record.display_name}, status=201)
+                vals = body.get('params', body) if isinstance(body, dict) else body
+                return self._json_response(self._create_records(Model, vals), status=201)
             
             elif method == 'PUT':
                 if not rec_id: return self._json_response({'error': "ID required"}, status=400)
@@ -445,12 +871,7 @@ class ApiAuthController(http.Controller):
 
                 # Specialized logic for res.users update
                 if model_name == 'res.users':
-                    password = vals.get('password')
-                    confirm_password = vals.get('confirm_password')
-                    if password or confirm_password:
-                        if password != confirm_password:
-                            return self._json_response({'error': 'Bad Request', 'message': 'Passwords do not match.'}, status=400)
-                        vals.pop('confirm_password', None)
+                    self._check_user_vals(Model, vals, create=False)
 
                 record.write(vals)
                 return self._json_response({'success': True})
@@ -459,12 +880,733 @@ class ApiAuthController(http.Controller):
                 if not rec_id: return self._json_response({'error': "ID required"}, status=400)
                 record = Model.browse(rec_id)
                 if not record.exists(): return self._json_response({'error': "Not found"}, status=404)
-                record.unlink()
+                # Flag API deletions so they leave a tombstone for the change feed
+                record.with_context(rest_api_tombstone=True).unlink()
                 return self._json_response({'success': True}, status=204)
                 
             return self._json_response({'warn': "Method not allowed"}, status=405)
-        except AccessError as e:
-            return self._json_response({'error': "Access Denied", 'message': str(e)}, status=403)
         except Exception as e:
-            _logger.exception("REST API Error")
-            return self._json_response({'error': str(e)}, status=500)
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    def _queue_job(self, Model, rec_id, method):
+        """
+        async=true: stores a list read, a create or an update as a rest.api.job,
+        run by the job cron on its own cursor, and answers 202 with the job id.
+        """
+        if Model._name == 'res.users':
+            raise werkzeug.exceptions.BadRequest("Asynchronous mode is not available for res.users")
+        if method == 'GET' and not rec_id:
+            params = self._read_params()
+            fields_list, nested_fields = self._parse_fields(params.get('fields'))
+            if nested_fields:
+                raise werkzeug.exceptions.BadRequest("Asynchronous reads do not expand dotted fields")
+            Model, domain = self._prepare_domain(Model, params)
+            order_field, direction = self._parse_order(Model, params.get('order'))
+            operation, access, payload = 'read', 'read', {
+                'domain': domain,
+                'fields': self._list_fields(Model, fields_list, params),
+                'order': f'{order_field} {direction}' if order_field else None,
+                'limit': int(params['limit']) if params.get('limit') else None,
+                'many2one': self._parse_many2one(params),
+                'context': {'active_test': Model.env.context.get('active_test', True)},
+            }
+        elif method in ('POST', 'PUT'):
+            body = json.loads(request.httprequest.data)
+            vals = body.get('params', body) if isinstance(body, dict) else body
+            if method == 'POST':
+                vals_list = vals if isinstance(vals, list) else [vals]
+                if not vals_list or not all(isinstance(v, dict) for v in vals_list):
+                    raise werkzeug.exceptions.BadRequest("Values must be an object or a list of objects")
+                operation, access, payload = 'create', 'create', {'values': vals_list}
+            else:
+                if not rec_id:
+                    raise werkzeug.exceptions.BadRequest("ID required")
+                if not isinstance(vals, dict):
+                    raise werkzeug.exceptions.BadRequest("Values must be an object")
+                operation, access, payload = 'write', 'write', {'id': rec_id, 'values': vals}
+        else:
+            raise werkzeug.exceptions.BadRequest("Asynchronous mode supports list reads, creates and updates")
+
+        # Fail fast on model access, record rules are applied when the job runs
+        Model.check_access(access)
+        job = request.env['rest.api.job']._enqueue(Model._name, operation, payload)
+        status_url = f'/api/v1/jobs/{job.id}'
+        _logger.info("REST API: Queued job %s (%s on %s)", job.id, operation, Model._name)
+        return self._json_response(
+            {'job_id': job.id, 'state': job.state, 'status_url': status_url},
+            status=202,
+            headers=[('Location', status_url)],
+        )
+
+    def _get_job(self, job_id):
+        """The job job_id if it belongs to the current user (or the user is an admin)."""
+        job = request.env['rest.api.job'].sudo().browse(job_id).exists()
+        if not job or (job.user_id.id != request.env.uid and not request.env.user._is_admin()):
+            raise werkzeug.exceptions.NotFound("Job not found")
+        return job
+
+    @http.route('/api/v1/jobs/<int:job_id>', type='http', auth='api_key', methods=['GET'], csrf=False, readonly=_readonly_read)
+    def job_status(self, job_id, **kwargs):
+        """Status and progress of an asynchronous job, with the URL of its result once done."""
+        try:
+            job = self._get_job(job_id)
+            return self._json_response({
+                'id': job.id,
+                'state': job.state,
+                'operation': job.operation,
+                'model': job.model,
+                'progress': {'done': job.progress_done, 'total': job.progress_total},
+                'created_at': job.create_date,
+                'started_at': job.started_at,
+                'finished_at': job.finished_at,
+                'error': job.error or None,
+                'result_url': f'/api/v1/jobs/{job.id}/result' if job.result_id else None,
+            })
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    @http.route('/api/v1/jobs/<int:job_id>/result', type='http', auth='api_key', methods=['GET'], csrf=False, readonly=_readonly_read)
+    def job_result(self, job_id, **kwargs):
+        """Downloads the result of a finished job (JSON, or NDJSON for reads), with Range support."""
+        try:
+            job = self._get_job(job_id)
+            if not job.result_id:
+                return self._json_response({'error': "Not ready", 'state': job.state}, status=409)
+            stream = request.env['ir.binary']._get_stream_from(job.result_id.sudo())
+            response = stream.get_response(as_attachment=str(kwargs.get('download', '')).lower() == 'true')
+            response.cache_control.public = False
+            response.cache_control.private = True
+            return response
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    @http.route('/api/v1/<string:model_name>/export', type='http', auth='api_key', methods=['GET'], csrf=False, readonly=_readonly_read)
+    def export_rest(self, model_name, **kwargs):
+        """
+        Bulk CSV/TSV export of stored, non-computed scalar fields straight from
+        SQL: one query with the access rules applied, streamed from a named
+        server-side cursor. Many2one columns hold ids. Use the regular list
+        read for computed or relational fields.
+        """
+        _logger.info("REST API: Export of %s", model_name)
+        Model = request.env.get(model_name)
+        if Model is None:
+            return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        metrics.request_timer(request).model = model_name
+
+        try:
+            params = self._read_params()
+            export_format = params.get('format') or 'csv'
+            if export_format not in ('csv', 'tsv'):
+                raise werkzeug.exceptions.BadRequest("Invalid format, use csv or tsv")
+            fields_list = params.get('fields') or ['id']
+            if isinstance(fields_list, str):
+                fields_list = json.loads(fields_list)
+            # Columns in the requested order, duplicates dropped
+            fields_list = list(dict.fromkeys(fields_list))
+            for name in fields_list:
+                field = Model._fields.get(name)
+                if not field or not field.store or field.compute or not field.column_type \
+                        or field.type not in EXPORT_FIELD_TYPES:
+                    raise werkzeug.exceptions.BadRequest(
+                        f"Cannot export '{name}': only stored, non-computed scalar fields are exported")
+
+            Model.check_access('read')
+            Model.check_field_access_rights('read', fields_list)
+            Model, domain = self._prepare_domain(Model, params)
+            order_field, direction = self._parse_order(Model, params.get('order'))
+            # _search applies the record rules and active_test, like search() does
+            query = Model._search(
+                domain,
+                order=f'{order_field} {direction}' if order_field else 'id',
+                limit=int(params['limit']) if params.get('limit') else None,
+            )
+            sql = query.select(*(
+                SQL('%s AS %s', Model._field_to_sql(Model._table, name, query), SQL.identifier(name))
+                for name in fields_list
+            ))
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+        datetime_columns = [i for i, name in enumerate(fields_list) if Model._fields[name].type == 'datetime']
+        include_header = str(params.get('header', 'true')).lower() != 'false'
+        registry = request.env.registry
+        readonly = not _read_your_writes()
+
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, delimiter='\t' if export_format == 'tsv' else ',', lineterminator='\n')
+            if include_header:
+                writer.writerow(fields_list)
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            with registry.cursor(readonly=readonly) as cr:
+                try:
+                    with cr._cnx.cursor('rest_api_export') as server_cursor:
+                        server_cursor.itersize = EXPORT_BATCH_SIZE
+                        server_cursor.execute(sql.code, sql.params)
+                        while rows := server_cursor.fetchmany(EXPORT_BATCH_SIZE):
+                            for row in rows:
+                                if datetime_columns:
+                                    row = list(row)
+                                    for i in datetime_columns:
+                                        if row[i]:
+                                            row[i] = fields.Datetime.to_string(row[i])
+                                writer.writerow(row)
+                            yield buffer.getvalue().encode()
+                            buffer.seek(0)
+                            buffer.truncate()
+                except Exception as e:
+                    # Headers are gone already, report the failure as a last line
+                    _logger.exception("REST API: Export of %s failed", model_name)
+                    writer.writerow([f'ERROR: {e}'])
+                    yield buffer.getvalue().encode()
+
+        content_type = 'text/tab-separated-values' if export_format == 'tsv' else 'text/csv'
+        return request.make_response(generate(), headers=[
+            ('Content-Type', f'{content_type}; charset=utf-8'),
+            ('Content-Disposition', f'attachment; filename="{model_name}.{export_format}"'),
+        ])
+
+    # Not a readonly route: changed ids are matched on the primary that notified them
+    @http.route('/api/v1/<string:model_name>/subscribe', type='http', auth='api_key', methods=['GET', 'POST'], csrf=False)
+    def subscribe_rest(self, model_name, **kwargs):
+        """
+        Long-poll for changes: waits up to 'timeout' seconds for records
+        matching 'domain' to be created or written, or for records of the
+        model to be deleted, and returns their ids as soon as it happens.
+        """
+        Model = request.env.get(model_name)
+        if Model is None:
+            return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        metrics.request_timer(request).model = model_name
+
+        try:
+            params = self._read_params()
+            Model, domain = self._prepare_domain(Model, params)
+            Model.check_access('read')
+            max_timeout = int(request.env['ir.config_parameter'].sudo().get_param('rest_api.subscribe_timeout', 30))
+            timeout = min(float(params.get('timeout') or max_timeout), max_timeout)
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+        if not _subscribers.acquire(blocking=False):
+            return self._json_response(
+                {'error': "Too many subscribers", 'message': "Retry later or use the change feed."},
+                status=503, headers=[('Retry-After', '5')],
+            )
+        try:
+            return self._json_response(self._wait_for_changes(Model, domain, timeout))
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+        finally:
+            _subscribers.release()
+
+    def _wait_for_changes(self, Model, domain, timeout):
+        """Waits for notifications of changes to Model (see tools/notifications.py)."""
+        shared_state.subscribe(request.db, Model._name)
+        listener = notifications.Listener(request.db)
+        # Do not keep a transaction open while waiting
+        request.env.cr.commit()
+        try:
+            deadline = time.monotonic() + timeout
+            changed, deleted = set(), set()
+            while not (changed or deleted):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                touched = set()
+                for notification in listener.wait(remaining):
+                    if notification['model'] != Model._name:
+                        continue
+                    if notification['op'] == 'unlink':
+                        # Deleted records cannot be matched against the domain anymore
+                        deleted.update(notification['ids'])
+                    else:
+                        touched.update(notification['ids'])
+                if touched:
+                    changed.update(Model.search(domain + [('id', 'in', list(touched))]).ids)
+        finally:
+            listener.close()
+        return {
+            'changed': sorted(changed),
+            'deleted': sorted(deleted),
+            'timeout': not (changed or deleted),
+        }
+
+    @http.route('/api/v1/<string:model_name>/<int:rec_id>/<string:field_name>', type='http', auth='api_key', methods=['GET'], csrf=False, readonly=_readonly_read)
+    def binary_rest(self, model_name, rec_id, field_name, **kwargs):
+        """
+        Serves the content of a binary field straight from the filestore,
+        without base64 round-trips. Supports Range requests and revalidation
+        through an ETag derived from the attachment checksum; with a 'unique'
+        param matching that checksum the response is cacheable for a year.
+        download=true serves it as an attachment.
+        """
+        Model = request.env.get(model_name)
+        if Model is None:
+            return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        metrics.request_timer(request).model = model_name
+        field = Model._fields.get(field_name)
+        if field is None or field.type != 'binary':
+            return self._json_response({'error': f"Binary field '{field_name}' not found"}, status=404)
+
+        try:
+            record = Model.browse(rec_id).exists()
+            if not record:
+                return self._json_response({'error': "Not found"}, status=404)
+            record.check_access('read')
+            Model.check_field_access_rights('read', [field_name])
+            try:
+                stream = request.env['ir.binary']._get_stream_from(record, field_name)
+            except MissingError:
+                return self._json_response({'error': "Not found", 'message': f"'{field_name}' is empty"}, status=404)
+
+            unique = kwargs.get('unique')
+            immutable = bool(unique) and stream.etag and unique == stream.etag.strip('"')
+            response = stream.get_response(
+                as_attachment=str(kwargs.get('download', '')).lower() == 'true',
+                immutable=immutable,
+            )
+            # Authenticated content: browsers may keep it, shared caches must not
+            response.cache_control.public = False
+            response.cache_control.private = True
+            return response
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    # Not a readonly route: the horizon is the oldest transaction running on the primary
+    @http.route('/api/v1/<string:model_name>/changes', type='http', auth='api_key', methods=['GET'], csrf=False)
+    def changes_rest(self, model_name, **kwargs):
+        """
+        Change feed for incremental sync. Returns the records created or
+        modified since the 'since' token (archived ones included) and the ids
+        deleted since then, plus the token to pass on the next call.
+        Deletions are seen through tombstones: API deletions, and deletions of
+        the models of rest_api.tombstone_models, cascaded ones included (see
+        base._rest_api_cascaded_deletions).
+        """
+        _logger.info("REST API: Change feed of %s", model_name)
+        Model = request.env.get(model_name)
+        if Model is None:
+            return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        metrics.request_timer(request).model = model_name
+        if 'write_date' not in Model._fields:
+            return self._json_response({'error': f"Model '{model_name}' does not track write dates"}, status=400)
+
+        try:
+            params = request.params.copy()
+            Model.check_access('read')
+            limit = int(params.get('limit') or 80)
+            use_image_url = str(params.get('image_url', '')).lower() == 'true'
+            fields_list, nested_fields = self._parse_fields(params.get('fields'))
+            fields_list = self._list_fields(Model, fields_list, params)
+            expand_limit = self._parse_expand_limit(params)
+            many2one = self._parse_many2one(params)
+
+            Tombstone = request.env['rest.api.tombstone'].sudo()
+            now = request.env.cr.now()
+            horizon = self._changes_horizon()
+
+            if params.get('since'):
+                watermark, last_id, tombstone_watermark, last_tombstone = self._decode_change_token(params['since'])
+                if watermark and watermark < now - timedelta(days=Tombstone._retention_days()):
+                    raise werkzeug.exceptions.Gone("Token is older than the tombstone retention, a full resync is needed")
+            else:
+                # First sync: start from the beginning, deletions before it are irrelevant
+                watermark, last_id = None, 0
+                tombstone_watermark, last_tombstone = horizon, 0
+
+            domain = [('write_date', '<', horizon)]
+            if watermark:
+                domain += ['|', ('write_date', '>', watermark), '&', ('write_date', '=', watermark), ('id', '>', last_id)]
+            records = Model.with_context(active_test=False).search(domain, order='write_date asc, id asc', limit=limit + 1)
+            has_more = len(records) > limit
+            records = records[:limit]
+            if records:
+                watermark, last_id = records[-1].write_date, records[-1].id
+
+            # Tombstones are paged like records: ids follow insertion, not commit order
+            tombstone_domain = [('model', '=', Model._name), ('create_date', '<', horizon)]
+            if tombstone_watermark:
+                tombstone_domain += ['|', ('create_date', '>', tombstone_watermark),
+                                     '&', ('create_date', '=', tombstone_watermark), ('id', '>', last_tombstone)]
+            else:
+                tombstone_domain.append(('id', '>', last_tombstone))  # Token issued before the date watermark
+            tombstones = Tombstone.search(tombstone_domain, order='create_date asc, id asc', limit=limit + 1)
+            has_more = has_more or len(tombstones) > limit
+            tombstones = tombstones[:limit]
+            if tombstones:
+                tombstone_watermark, last_tombstone = tombstones[-1].create_date, tombstones[-1].id
+
+            results = records.read(fields_list)
+            if use_image_url:
+                results = self._transform_binary_to_url(Model, results)
+            if nested_fields:
+                results = self._expand_relations(Model, results, nested_fields, expand_limit=expand_limit,
+                                                 many2one=many2one)
+            results = self._convert_rows(Model, results, fields_list, nested_fields, many2one)
+
+            return self._json_response({
+                'changed': results,
+                'deleted': tombstones.mapped('res_id'),
+                'has_more': has_more,
+                'next_token': self._encode_change_token(watermark, last_id, tombstone_watermark, last_tombstone),
+            })
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    @http.route('/api/v1/<string:model_name>/aggregate', type='http', auth='api_key', methods=['GET', 'POST'], csrf=False, readonly=_readonly_read)
+    def aggregate_rest(self, model_name, **kwargs):
+        """
+        Server-side aggregation on read_group, so PostgreSQL does the grouping.
+        domain: same as list reads ("me", is_active supported)
+        groupby: ["partner_id", "date_order:month"] (day, week, month, quarter, year)
+        aggregates: ["amount_total:sum", "amount_total:avg"], a plain field name
+            uses the field's own aggregator; the count is always returned
+        lazy: group on the first groupby only, each group then carries the
+            '__domain' to query its sub-groups with
+        """
+        _logger.info("REST API: Aggregate on %s", model_name)
+        Model = request.env.get(model_name)
+        if Model is None:
+            return self._json_response({'error': f"Model '{model_name}' not found"}, status=404)
+        metrics.request_timer(request).model = model_name
+
+        try:
+            params = self._read_params()
+            Model, domain = self._prepare_domain(Model, params)
+            groupby = params.get('groupby') or []
+            aggregates = params.get('aggregates') or []
+            if isinstance(groupby, str):
+                groupby = json.loads(groupby) if groupby.startswith('[') else [groupby]
+            if isinstance(aggregates, str):
+                aggregates = json.loads(aggregates) if aggregates.startswith('[') else [aggregates]
+            # The count comes with every group, read_group does not take it as a field
+            aggregates = [spec for spec in aggregates if spec != '__count']
+            lazy = str(params.get('lazy', 'false')).lower() == 'true'
+            limit = int(params['limit']) if params.get('limit') else None
+            offset = int(params.get('offset', 0))
+
+            # Ask one group more than the page to know whether another one exists
+            groups = Model.read_group(
+                domain, aggregates, groupby, offset=offset,
+                limit=limit + 1 if limit else None,
+                orderby=params.get('order') or False, lazy=lazy,
+            )
+            has_more = bool(limit) and len(groups) > limit
+            if has_more:
+                groups = groups[:limit]
+
+            # Compact results: one 'count' key, drill-down domain only when useful
+            count_key = f"{groupby[0].split(':')[0]}_count" if lazy and groupby else '__count'
+            for group in groups:
+                group['__count'] = group.pop(count_key, group.get('__count'))
+                group.pop('__context', None)
+                group.pop('__fold', None)
+                if not (lazy and len(groupby) > 1):
+                    group.pop('__domain', None)
+
+            return self._json_response({
+                'count': len(groups),
+                'offset': offset,
+                'limit': limit,
+                'has_more': has_more,
+                'groups': groups,
+            })
+        except Exception as e:
+            status, error = self._error_payload(e)
+            return self._json_response(error, status=status)
+
+    def _changes_horizon(self):
+        """
+        Upper bound (excluded) of the change feed: the start of the oldest
+        transaction still running on the database. write_date / create_date
+        hold the start of the transaction that wrote them, so every row dated
+        before that bound is committed already, however long it took.
+        """
+        cr = request.env.cr
+        cr.execute(SQL("""
+            SELECT min(xact_start) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database() AND pid != pg_backend_pid() AND xact_start IS NOT NULL
+        """))
+        oldest = cr.fetchone()[0]
+        now = cr.now()
+        return min(oldest, now) if oldest else now
+
+    def _encode_change_token(self, watermark, last_id, tombstone_watermark, last_tombstone):
+        payload = json.dumps([watermark, last_id, tombstone_watermark, last_tombstone], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_change_token(self, token):
+        """Returns (write_date watermark, last record id, tombstone create_date watermark, last tombstone id)."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if len(values) == 3:
+                # Token of an earlier version, without tombstone date watermark
+                values = [values[0], values[1], None, values[2]]
+            watermark, last_id, tombstone_watermark, last_tombstone = values
+            # Keep microseconds: string dates would be truncated to the second
+            watermark = datetime.fromisoformat(watermark) if watermark else None
+            tombstone_watermark = datetime.fromisoformat(tombstone_watermark) if tombstone_watermark else None
+            return watermark, int(last_id), tombstone_watermark, int(last_tombstone)
+        except Exception:
+            raise werkzeug.exceptions.BadRequest("Invalid token")
+
+    @http.route('/api/v1/batch', type='http', auth='api_key', methods=['POST'], csrf=False)
+    def batch_rest(self, **kwargs):
+        """
+        Runs a list of create/write/unlink operations in one transaction.
+        Body: {"operations": [{"method": "create", "model": "res.partner", "values": {...}},
+                              {"method": "write", "model": "res.partner", "ids": [7], "values": {...}},
+                              {"method": "unlink", "model": "res.partner", "ids": [8]}],
+               "atomic": true}
+        With atomic (default) the first failure rolls every operation back,
+        otherwise each operation runs in its own savepoint and reports its status.
+        """
+        try:
+            body = json.loads(request.httprequest.data)
+        except Exception:
+            return self._json_response({'error': "Invalid JSON body"}, status=400)
+        if isinstance(body, dict):
+            body = body.get('params', body)
+        operations = body.get('operations') if isinstance(body, dict) else body
+        if not isinstance(operations, list):
+            return self._json_response({'error': "'operations' must be a list"}, status=400)
+        atomic = str(body.get('atomic', True)).lower() != 'false' if isinstance(body, dict) else True
+        _logger.info("REST API: Batch of %s operations (atomic=%s)", len(operations), atomic)
+
+        results = []
+        if atomic:
+            try:
+                with request.env.cr.savepoint():
+                    for operation in operations:
+                        status, payload = self._run_batch_operation(operation)
+                        results.append(dict(payload, status=status))
+            except Exception as e:
+                status, error = self._error_payload(e)
+                return self._json_response(dict(error, index=len(results)), status=status)
+            return self._json_response({'count': len(results), 'errors': 0, 'results': results})
+
+        errors = 0
+        for operation in operations:
+            try:
+                with request.env.cr.savepoint():
+                    status, payload = self._run_batch_operation(operation)
+            except Exception as e:
+                status, payload = self._error_payload(e)
+                errors += 1
+            results.append(dict(payload, status=status))
+        return self._json_response({'count': len(results), 'errors': errors, 'results': results})
+
+    @http.route('/api/v1/query', type='http', auth='api_key', methods=['POST'], csrf=False, readonly=_readonly_read)
+    def query_rest(self, **kwargs):
+        """
+        Runs named read queries in one request and returns their results keyed by name.
+        Body: {"queries": {"orders": {"model": "sale.order", "domain": [...], "fields": [...], "limit": 20},
+                           "lines": {"model": "sale.order.line", "domain": [["order_id", "in", "$orders.ids"]]},
+                           "partners": {"model": "res.partner", "domain": [["id", "in", "$orders.partner_id"]]},
+                           "open": {"model": "sale.order", "domain": [...], "count": true}}}
+        Queries run in order; a domain value "$name.ids" or "$name.<field>"
+        stands for the ids (or field values) of the records of an earlier query.
+        """
+        timer = metrics.request_timer(request)
+        timer.model = 'query'
+        try:
+            body = json.loads(request.httprequest.data)
+        except Exception:
+            return self._json_response({'error': "Invalid JSON body"}, status=400)
+        queries = body.get('queries', body) if isinstance(body, dict) else None
+        if not isinstance(queries, dict) or not queries or not all(isinstance(q, dict) for q in queries.values()):
+            return self._json_response({'error': "'queries' must map names to queries"}, status=400)
+        if len(queries) > QUERY_MAX_SUBQUERIES:
+            return self._json_response({'error': f"At most {QUERY_MAX_SUBQUERIES} queries per request"}, status=400)
+        _logger.info("REST API: Composite query of %s", ', '.join(queries))
+
+        base_url = request.httprequest.url_root.rstrip('/')
+        records_by_name = {}
+        results = {}
+        name = None
+        try:
+            for name, query in queries.items():
+                Model = request.env.get(query.get('model') or '')
+                if Model is None:
+                    raise werkzeug.exceptions.NotFound(f"Model '{query.get('model')}' not found")
+                domain = query.get('domain') or []
+                if isinstance(domain, str):
+                    domain = json.loads(domain)
+                domain = self._resolve_references(domain, records_by_name)
+                Model, domain = self._prepare_domain(Model, dict(query, domain=domain))
+
+                if str(query.get('count', '')).lower() == 'true':
+                    with timer.phase('count'):
+                        results[name] = {'count': Model.search_count(domain)}
+                    continue
+
+                fields_list, nested_fields = self._parse_fields(query.get('fields'))
+                fields_list = self._list_fields(Model, fields_list, query)
+                many2one = self._parse_many2one(query)
+                order_field, direction = self._parse_order(Model, query.get('order'))
+                with timer.phase('read'):
+                    records = Model.search(
+                        domain,
+                        order=f'{order_field} {direction}' if order_field else None,
+                        limit=int(query.get('limit') or 80),
+                        offset=int(query.get('offset') or 0),
+                    )
+                    rows = records.read(fields_list)
+                if str(query.get('image_url', '')).lower() == 'true':
+                    with timer.phase('binary'):
+                        rows = self._transform_binary_to_url(Model, rows, base_url=base_url)
+                if nested_fields:
+                    with timer.phase('expand'):
+                        rows = self._expand_relations(Model, rows, nested_fields, base_url=base_url,
+                                                      expand_limit=self._parse_expand_limit(query), many2one=many2one)
+                rows = self._convert_rows(Model, rows, fields_list, nested_fields, many2one)
+
+                records_by_name[name] = records
+                results[name] = {'count': len(rows), 'results': rows}
+                if str(query.get('total', '')).lower() == 'true':
+                    with timer.phase('count'):
+                        results[name]['total'] = Model.search_count(domain)
+        except Exception as e:
+            status, error = self._error_payload(e)
+            error['query'] = name
+            return self._json_response(error, status=status)
+        return self._json_response(results)
+
+    def _resolve_references(self, domain, records_by_name):
+        """Replaces "$name.ids" / "$name.<field>" domain values by the ids or values of query 'name'."""
+        resolved = []
+        for leaf in domain:
+            if isinstance(leaf, (list, tuple)) and len(leaf) == 3 and isinstance(leaf[2], str) \
+                    and leaf[2].startswith('$'):
+                name, _, field_name = leaf[2][1:].partition('.')
+                records = records_by_name.get(name)
+                if records is None:
+                    raise werkzeug.exceptions.BadRequest(
+                        f"'{leaf[2]}' does not refer to an earlier query returning records")
+                if field_name in ('', 'ids'):
+                    value = records.ids
+                elif field_name in records._fields:
+                    value = records.mapped(field_name)
+                    value = value.ids if isinstance(value, models.BaseModel) else list(dict.fromkeys(value))
+                else:
+                    raise werkzeug.exceptions.BadRequest(f"Unknown field in reference '{leaf[2]}'")
+                leaf = [leaf[0], leaf[1], value]
+            resolved.append(leaf)
+        return resolved
+
+    def _run_batch_operation(self, operation):
+        """Runs one operation of a batch, returns (status, payload)."""
+        if not isinstance(operation, dict):
+            raise werkzeug.exceptions.BadRequest("Each operation must be an object")
+        method = str(operation.get('method') or '').lower()
+        model_name = operation.get('model')
+        Model = request.env.get(model_name) if isinstance(model_name, str) else None
+        if Model is None:
+            raise werkzeug.exceptions.NotFound(f"Model '{model_name}' not found")
+
+        if method == 'create':
+            return 201, self._create_records(Model, operation.get('values'))
+        if method not in ('write', 'unlink'):
+            raise werkzeug.exceptions.BadRequest(f"Unknown method '{method}', use create, write or unlink")
+
+        ids = operation.get('ids') or ([operation['id']] if operation.get('id') else [])
+        if not ids:
+            raise werkzeug.exceptions.BadRequest("ID required")
+        records = Model.browse(ids).exists()
+        missing = set(ids) - set(records.ids)
+        if missing:
+            raise werkzeug.exceptions.NotFound(f"Not found: {sorted(missing)}")
+
+        if method == 'write':
+            vals = operation.get('values') or {}
+            if Model._name == 'res.users':
+                self._check_user_vals(Model, vals, create=False)
+            records.write(vals)
+        else:
+            records.with_context(rest_api_tombstone=True).unlink()
+        return 200, {'success': True, 'ids': ids}
+
+    def _create_records(self, Model, vals):
+        """
+        Creates one record from a dict, or many from a list of dicts in a
+        single create() call. Returns the response payload.
+        """
+        vals_list = vals if isinstance(vals, list) else [vals]
+        if not vals_list or not all(isinstance(v, dict) for v in vals_list):
+            raise werkzeug.exceptions.BadRequest("Values must be an object or a list of objects")
+
+        is_users = Model._name == 'res.users'
+        if is_users:
+            for user_vals in vals_list:
+                self._check_user_vals(Model, user_vals)
+        records = Model.create(vals_list)
+
+        # Auto-generate API Key for new users
+        if is_users:
+            for user in records:
+                user.action_generate_api_key()
+
+        if isinstance(vals, list):
+            payload = {'count': len(records), 'ids': records.ids}
+            if is_users:
+                payload['api_keys'] = {user.id: user.rest_api_key for user in records}
+            return payload
+
+        payload = {'id': records.id, 'display_name': records.display_name}
+        if is_users:
+            payload['api_key'] = records.rest_api_key
+        return payload
+
+    def _check_user_vals(self, Model, vals, create=True):
+        """
+        Specialized checks for res.users values: login/email duplicates on
+        create and password confirmation. Raises Conflict or BadRequest.
+        """
+        if create:
+            login = vals.get('login')
+            email = vals.get('email')
+            
+            # 1. Duplication Check
+            domain = []
+            if login: domain.append(('login', '=', login))
+            if email: domain.append(('email', '=', email))
+            if domain and Model.sudo().search_read(['|'] + domain if len(domain) > 1 else domain, ['id'], limit=1):
+                raise werkzeug.exceptions.Conflict('A user with this login or email already exists.')
+
+        # 2. Password Validation
+        password = vals.get('password')
+        confirm_password = vals.get('confirm_password')
+        if password or confirm_password:
+            if password != confirm_password:
+                raise werkzeug.exceptions.BadRequest('Passwords do not match.')
+            # Odoo uses 'password' field for creation
+            vals.pop('confirm_password', None)
+
+    def _error_payload(self, e):
+        """
+        Maps an exception raised while serving a request to (status, body).
+        Errors Odoo recovers from by serving the request again are re-raised:
+        a write on the readonly cursor (retried on the read-write one) and
+        concurrency failures (retried after a rollback).
+        """
+        if isinstance(e, RETRIED_ERRORS):
+            raise e
+        if isinstance(e, AccessError):
+            return 403, {'error': "Access Denied", 'message': str(e)}
+        if isinstance(e, werkzeug.exceptions.HTTPException):
+            return e.code, {'error': e.name, 'message': e.description}
+        _logger.exception("REST API Error")
+        return 500, {'error': str(e)}
@@ -1,2 +1,7 @@
+from . import base
 from . import res_users
 from . import ir_http
+from . import ir_model
+from . import rest_api_tombstone
+from . import rest_api_token_revocation
+from . import rest_api_job
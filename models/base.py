@@ -0,0 +1,108 @@
+from odoo import models, api
+from collections import defaultdict
+from functools import partial
+from ..tools import notifications, shared_state
+
+
+class Base(models.AbstractModel):
+    _inherit = 'base'
+
+    def _rest_api_track_deletions(self):
+        """
+        Whether deleting records of this model leaves tombstones for the
+        change feed: always for deletions made through the API (flagged in
+        the context), and for any deletion of the models listed in the
+        'rest_api.tombstone_models' system parameter.
+        """
+        if self._transient or self._name == 'rest.api.tombstone':
+            return False
+        if self.env.context.get('rest_api_tombstone'):
+            return True
+        return self._name in self._rest_api_tombstone_models()
+
+    @api.model
+    def _rest_api_tombstone_models(self):
+        """Models listed in the 'rest_api.tombstone_models' system parameter."""
+        tracked = self.env['ir.config_parameter'].sudo().get_param('rest_api.tombstone_models') or ''
+        return {name.strip() for name in tracked.split(',') if name.strip() in self.env}
+
+    def _rest_api_cascaded_deletions(self, tracked, seen=None):
+        """
+        Records of the tracked models that PostgreSQL deletes with these ones,
+        through ondelete='cascade' many2one fields (order lines with their
+        order), recursively. The ORM never sees them go.
+        """
+        seen = defaultdict(set) if seen is None else seen
+        seen[self._name].update(self.ids)
+        children = []
+        for model_name in tracked:
+            Child = self.env[model_name].sudo().with_context(active_test=False)
+            names = [
+                name for name, field in Child._fields.items()
+                if field.type == 'many2one' and field.store and field.comodel_name == self._name
+                and field.ondelete == 'cascade'
+            ]
+            if not names:
+                continue
+            domain = ['|'] * (len(names) - 1) + [(name, 'in', self.ids) for name in names]
+            records = Child.search(domain).filtered(lambda record: record.id not in seen[model_name])
+            if records:
+                children.append(records)
+                children += records._rest_api_cascaded_deletions(tracked, seen)
+        return children
+
+    def _rest_api_signal_changes(self):
+        """
+        Signals the change of this model to the other workers once the
+        transaction commits, when the response cache reads from it (see
+        shared_state.signal_model_changes).
+        """
+        if self._transient:
+            return
+        postcommit = self.env.cr.postcommit
+        changed = postcommit.data.get('rest_api.changed_models')
+        if changed is None:
+            changed = postcommit.data['rest_api.changed_models'] = set()
+            postcommit.add(partial(shared_state.signal_model_changes, self.env.cr.dbname, changed))
+        changed.add(self._name)
+
+    def _rest_api_notify(self, operation):
+        """
+        Queues a notification of operation on these records for the
+        subscribers of the model, sent with the transaction (see subscribe_rest).
+        """
+        if self._transient or not shared_state.has_subscribers(self.env.cr.dbname, self._name):
+            return
+        precommit = self.env.cr.precommit
+        changes = precommit.data.get('rest_api.notifications')
+        if changes is None:
+            changes = precommit.data['rest_api.notifications'] = defaultdict(set)
+            precommit.add(partial(notifications.send, self.env.cr, changes))
+        changes[self._name, operation].update(self.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._rest_api_signal_changes()
+        records._rest_api_notify('create')
+        return records
+
+    def _write(self, vals):
+        # Low-level write: also reached by stored computed fields recomputed on flush
+        if self:
+            self._rest_api_signal_changes()
+            self._rest_api_notify('write')
+        return super()._write(vals)
+
+    def unlink(self):
+        if self:
+            if self._rest_api_track_deletions():
+                self.env['rest.api.tombstone']._record(self._name, self.ids)
+            self._rest_api_signal_changes()
+            self._rest_api_notify('unlink')
+            if not self._transient and self._name != 'rest.api.tombstone':
+                for children in self._rest_api_cascaded_deletions(self._rest_api_tombstone_models()):
+                    self.env['rest.api.tombstone']._record(children._name, children.ids)
+                    children._rest_api_signal_changes()
+                    children._rest_api_notify('unlink')
+        return super().unlink()
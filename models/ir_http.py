@@ -1,5 +1,9 @@
 from odoo import models, http, fields
 from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .res_users import api_key_digest
+from ..tools import admission, compression, metrics, tokens
+import json
 import logging
 import werkzeug.exceptions
 
@@ -10,23 +14,114 @@ class IrHttp(models.AbstractModel):
 
     @classmethod
     def _auth_method_api_key(cls):
+        timer = metrics.request_timer(request)
+        with timer.phase('auth'):
+            cls._authenticate_api_key()
+        with timer.phase('admission'):
+            cls._rest_api_admit()
+
+    @classmethod
+    def _authenticate_api_key(cls):
         # Extract key from header X-API-Key or Authorization
         key = cls._extract_api_key()
         if not key:
             _logger.warning("REST API AUTH: Missing API Key in request headers")
             raise werkzeug.exceptions.Unauthorized("API Key required")
 
-        # Search for user with this key
-        user = request.env['res.users'].sudo().search([('rest_api_key', '=', key)], limit=1)
+        if tokens.is_token(key):
+            # Signed access token: checked without querying the database
+            uid = tokens.validate(request.env, key)
+        else:
+            # Resolve the key through its indexed digest, cached per worker
+            try:
+                uid = request.env['res.users']._rest_api_uid_from_digest(api_key_digest(key))
+            except AccessDenied:
+                uid = False
 
-        if not user:
+        if not uid:
             _logger.warning("REST API AUTH: Invalid API Key provided: %s", key[:8] + "...")
             raise werkzeug.exceptions.Unauthorized("Invalid API Key")
 
-        _logger.info("REST API AUTH: Successfully authenticated user %s (ID: %s)", user.login, user.id)
+        _logger.debug("REST API AUTH: Successfully authenticated user ID %s", uid)
         
         # Update environment with the user
-        request.update_env(user=user.id)
+        request.update_env(user=uid)
+
+    @classmethod
+    def _rest_api_admit(cls):
+        """
+        Admission control of the authenticated user: a token bucket of
+        rest_api.rate_limit tokens per second up to rest_api.rate_burst, a
+        request costing its rows x expansion depth per rest_api.cost_rows rows,
+        and at most rest_api.max_concurrent requests in flight. Disabled while
+        both rest_api.rate_limit and rest_api.max_concurrent are 0 (default).
+        A request authenticated again (retried after a serialization failure,
+        or on a read-write cursor after a readonly one) is admitted only once.
+        """
+        if getattr(request, 'rest_api_admitted', False):
+            return
+        ICP = request.env['ir.config_parameter'].sudo()
+        rate = float(ICP.get_param('rest_api.rate_limit') or 0)
+        max_concurrent = int(ICP.get_param('rest_api.max_concurrent') or 0)
+        if not rate and not max_concurrent:
+            return
+        burst = float(ICP.get_param('rest_api.rate_burst') or rate * 10)
+        cost = cls._rest_api_cost(int(ICP.get_param('rest_api.cost_rows') or 1000))
+
+        uid = request.env.uid
+        slot, retry_after = admission.admit(request.db, uid, cost, rate, burst, max_concurrent)
+        if retry_after:
+            _logger.info("REST API: Throttled user %s (cost %.1f), retry after %ss", uid, cost, retry_after)
+            raise werkzeug.exceptions.TooManyRequests(
+                "Too many requests, retry later.", retry_after=retry_after)
+        request.rest_api_admitted = True
+        if slot:
+            request.rest_api_slot = (request.db, uid, slot)
+
+    @classmethod
+    def _rest_api_cost(cls, rows_per_token):
+        """
+        Tokens taken by the request (see admission.request_cost), from its
+        query string and JSON body params, as the endpoints read them.
+        """
+        httprequest = request.httprequest
+        params = dict(httprequest.args.items())
+        try:
+            body = json.loads(httprequest.get_data()) if httprequest.get_data() else None
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            params.update(body)
+            if isinstance(body.get('operations'), list):
+                params['limit'] = len(body['operations']) or 1
+        elif isinstance(body, list):
+            # Bulk create: weighed like reading as many rows
+            params['limit'] = len(body) or 1
+
+        if httprequest.path == '/api/v1/query':
+            # Composite query: the sum of its sub-queries
+            queries = params.get('queries', params)
+            if isinstance(queries, dict):
+                return sum(
+                    admission.request_cost(query, rows_per_token)
+                    for query in queries.values() if isinstance(query, dict)
+                ) or 1
+            return 1
+        # Reads returning every match when no limit is given
+        unbounded = (
+            httprequest.path.endswith('/export')
+            or 'application/x-ndjson' in httprequest.headers.get('Accept', '')
+            or (httprequest.method == 'GET' and str(params.get('async', '')).lower() == 'true')
+        )
+        return admission.request_cost(params, rows_per_token, unbounded=unbounded)
+
+    @classmethod
+    def _rest_api_release(cls):
+        """Frees the in-flight slot taken by _rest_api_admit, if any."""
+        slot = getattr(request, 'rest_api_slot', None)
+        if slot:
+            request.rest_api_slot = None
+            admission.release(*slot)
 
     @classmethod
     def _extract_api_key(cls):
@@ -42,3 +137,57 @@ class IrHttp(models.AbstractModel):
 
         # 3. Check query params as fallback
         return request.params.get("api_key")
+
+    @classmethod
+    def _post_dispatch(cls, response):
+        super()._post_dispatch(response)
+        if not request.httprequest.path.startswith('/api/'):
+            return
+        timer = metrics.request_timer(request)
+        with timer.phase('compress'):
+            cls._rest_api_compress(response)
+        cls._rest_api_record_timing(timer, response)
+        slot = getattr(request, 'rest_api_slot', None)
+        if slot and response.is_streamed:
+            # The body is produced while it is sent: the request stays in
+            # flight until the server closes the response
+            request.rest_api_slot = None
+            response.call_on_close(lambda: admission.release(*slot))
+        else:
+            cls._rest_api_release()
+
+    @classmethod
+    def _handle_error(cls, exception):
+        cls._rest_api_release()
+        return super()._handle_error(exception)
+
+    @classmethod
+    def _rest_api_compress(cls, response):
+        """Compresses API responses, see the rest_api.compression_* system parameters."""
+        min_size, level = 1024, 6
+        if request.db:
+            ICP = request.env['ir.config_parameter'].sudo()
+            min_size = int(ICP.get_param('rest_api.compression_min_size', min_size))
+            level = int(ICP.get_param('rest_api.compression_level', level))
+        if min_size >= 0:
+            compression.compress_response(response, request.httprequest, min_size, level)
+
+    @classmethod
+    def _rest_api_record_timing(cls, timer, response):
+        """Adds the Server-Timing header, feeds the metrics and logs slow requests."""
+        method = request.httprequest.method
+        response.headers['Server-Timing'] = timer.server_timing()
+        metrics.registry.observe(timer, timer.model, method)
+
+        if not request.db:
+            return
+        slow_ms = int(request.env['ir.config_parameter'].sudo().get_param('rest_api.slow_request_ms') or 0)
+        elapsed_ms = timer.elapsed() * 1000
+        if slow_ms and elapsed_ms >= slow_ms:
+            queries, query_time = timer.sql()
+            _logger.warning(
+                "REST API SLOW: %s %s took %.0f ms (%s queries, %.0f ms SQL) phases=%s domain=%s fields=%s",
+                method, request.httprequest.path, elapsed_ms, queries, query_time * 1000,
+                {name: round(totals[0] * 1000, 1) for name, totals in timer.phases.items()},
+                timer.details.get('domain'), timer.details.get('fields'),
+            )
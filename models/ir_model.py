@@ -0,0 +1,27 @@
+from odoo import models, api, tools
+import hashlib
+import json
+
+
+class IrModel(models.Model):
+    _inherit = 'ir.model'
+
+    @api.model
+    @tools.ormcache('model_name', 'lang')
+    def _rest_api_metadata(self, model_name, lang):
+        """
+        Field metadata used by the REST API, computed once per registry.
+        The ormcache lives on the registry, so it is rebuilt whenever modules
+        are installed or upgraded. Callers must not mutate the result.
+        """
+        fields_info = self.env[model_name].sudo().with_context(lang=lang).fields_get()
+        fields_json = json.dumps(fields_info, default=str, sort_keys=True)
+        return {
+            'fields_json': fields_json,
+            'etag': hashlib.sha1(fields_json.encode()).hexdigest(),
+            'types': {name: info['type'] for name, info in fields_info.items()},
+            'binary_fields': tuple(name for name, info in fields_info.items() if info['type'] == 'binary'),
+            'relations': {
+                name: info['relation'] for name, info in fields_info.items() if info.get('relation')
+            },
+        }
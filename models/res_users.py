@@ -1,12 +1,68 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+from odoo.exceptions import AccessDenied
+import hashlib
 import secrets
 
+
+def api_key_digest(key):
+    """Returns the digest under which an API key is stored and looked up."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
 class ResUsers(models.Model):
     _inherit = 'res.users'
 
     rest_api_key = fields.Char(string="REST API Key", readonly=True, copy=False)
+    rest_api_key_digest = fields.Char(
+        string="REST API Key Digest", compute='_compute_rest_api_key_digest',
+        store=True, index=True, readonly=True, copy=False)
     show_rest_api_key = fields.Boolean(string="Show API Key", default=False)
 
+    @api.depends('rest_api_key')
+    def _compute_rest_api_key_digest(self):
+        for user in self:
+            user.rest_api_key_digest = api_key_digest(user.rest_api_key) if user.rest_api_key else False
+
+    def write(self, vals):
+        # Keys are cached per worker (see _rest_api_uid_from_digest), clearing
+        # the registry cache signals every worker to drop its entries. Unknown
+        # keys are not cached: a first key needs no invalidation, only a key
+        # replaced or removed, or a user (de)activated.
+        invalidate = False
+        if 'rest_api_key' in vals:
+            invalidate = any(user.rest_api_key and user.rest_api_key != vals['rest_api_key'] for user in self.sudo())
+        if 'active' in vals and not invalidate:
+            invalidate = any(user.active != bool(vals['active']) for user in self.sudo().with_context(active_test=False))
+        res = super().write(vals)
+        if invalidate:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('key_digest')
+    def _rest_api_uid_from_digest(self, key_digest):
+        """
+        Resolves a key digest to an active user id. Unknown digests raise
+        AccessDenied: exceptions are not cached, so random keys cannot fill
+        the shared ormcache and evict the entries of other caches.
+        """
+        user = self.sudo().search([('rest_api_key_digest', '=', key_digest)], limit=1)
+        if not user:
+            raise AccessDenied()
+        return user.id
+
+    @api.model
+    @tools.ormcache('uid')
+    def _rest_api_key_fingerprint(self, uid):
+        """Fingerprint of the key of an active user, embedded in its access tokens."""
+        user = self.sudo().search([('id', '=', uid)], limit=1)
+        return (user.rest_api_key_digest or '')[:16]
+
     def toggle_api_key(self):
         self.ensure_one()
         self.show_rest_api_key = not self.show_rest_api_key
@@ -0,0 +1,179 @@
+from odoo import models, fields, api
+from odoo.tools import SQL, split_every
+from datetime import timedelta
+import logging
+import tempfile
+import time
+
+from ..tools import serializer
+
+_logger = logging.getLogger(__name__)
+
+# Records read or created per batch, progress is reported after each batch
+JOB_BATCH_SIZE = 1000
+# Seconds a cron run keeps picking queued jobs before handing over to a new run
+JOB_TIME_BUDGET = 240
+
+
+class RestApiJob(models.Model):
+    _name = 'rest.api.job'
+    _description = 'REST API Asynchronous Job'
+    _order = 'id desc'
+
+    user_id = fields.Many2one('res.users', string="User", required=True, index=True, ondelete='cascade', readonly=True)
+    model = fields.Char(string="Model", required=True, readonly=True)
+    operation = fields.Selection([
+        ('read', 'Read'),
+        ('create', 'Create'),
+        ('write', 'Write'),
+    ], string="Operation", required=True, readonly=True)
+    payload = fields.Json(string="Payload", readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string="Status", required=True, default='queued', index=True)
+    progress_done = fields.Integer(string="Processed")
+    progress_total = fields.Integer(string="Total")
+    error = fields.Text(string="Error")
+    started_at = fields.Datetime(string="Started")
+    finished_at = fields.Datetime(string="Finished")
+    result_id = fields.Many2one('ir.attachment', string="Result", ondelete='set null')
+
+    @api.model
+    def _enqueue(self, model_name, operation, payload):
+        """Queues a job of the current user and wakes the job runner up."""
+        job = self.sudo().create({
+            'user_id': self.env.uid,
+            'model': model_name,
+            'operation': operation,
+            'payload': payload,
+        })
+        self.env.ref('rest_api.ir_cron_rest_api_jobs').sudo()._trigger()
+        return job
+
+    @api.model
+    def _run_queued_jobs(self):
+        """Cron: runs queued jobs, oldest first, until none is left or the time budget is spent."""
+        deadline = time.monotonic() + JOB_TIME_BUDGET
+        while time.monotonic() < deadline:
+            job = self._claim_job()
+            if not job:
+                return
+            job._run()
+        # Time is up with jobs possibly left: continue in a new run
+        self.env.ref('rest_api.ir_cron_rest_api_jobs')._trigger()
+
+    @api.model
+    def _claim_job(self):
+        """Marks the oldest queued job running and commits, several runners never pick the same one."""
+        self.env.cr.execute(SQL(
+            "SELECT id FROM rest_api_job WHERE state = 'queued' ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED"
+        ))
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.browse()
+        job = self.browse(row[0])
+        job.write({'state': 'running', 'started_at': fields.Datetime.now()})
+        self.env.cr.commit()
+        return job
+
+    def _run(self):
+        """Runs the job as its user, in one transaction, and stores the result as an attachment."""
+        self.ensure_one()
+        _logger.info("REST API: Running job %s (%s on %s)", self.id, self.operation, self.model)
+        try:
+            Model = self.env[self.model].with_user(self.user_id).with_context(self.payload.get('context') or {})
+            result, mimetype, extension = getattr(self, f'_run_{self.operation}')(Model)
+            attachment = self.env['ir.attachment'].sudo().create({
+                'name': f'rest_api_job_{self.id}.{extension}',
+                'raw': result,
+                'mimetype': mimetype,
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+            # The job row was updated by _report_progress meanwhile: commit the
+            # work first, the status is then written from a fresh snapshot
+            self.env.cr.commit()
+            self.invalidate_recordset(['progress_done', 'progress_total'])
+            self.write({
+                'state': 'done',
+                'result_id': attachment.id,
+                'progress_done': self.progress_total,
+                'finished_at': fields.Datetime.now(),
+            })
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.info("REST API: Job %s failed: %s", self.id, e)
+            self.write({'state': 'failed', 'error': str(e), 'finished_at': fields.Datetime.now()})
+        self.env.cr.commit()
+
+    def _report_progress(self, done, total):
+        """Publishes the progress at once, from its own transaction."""
+        with self.env.registry.cursor() as cr:
+            cr.execute(SQL(
+                "UPDATE rest_api_job SET progress_done = %s, progress_total = %s WHERE id = %s",
+                done, total, self.id,
+            ))
+
+    def _run_read(self, Model):
+        """Reads the matching records, the result is NDJSON (one record per line)."""
+        payload = self.payload
+        fields_list = payload.get('fields') or []
+        ids = Model.search(payload.get('domain') or [], order=payload.get('order'), limit=payload.get('limit')).ids
+        types = self.env['ir.model']._rest_api_metadata(Model._name, Model.env.lang)['types']
+        converter = serializer.row_converter(
+            tuple(sorted((name, types[name]) for name in (fields_list or types) if name in types)),
+            payload.get('many2one') or 'pair',
+        )
+
+        done = 0
+        self._report_progress(done, len(ids))
+        # Serialized batches go to disk, the result is only in memory once, at the end
+        with tempfile.TemporaryFile() as result:
+            for batch_ids in split_every(JOB_BATCH_SIZE, ids):
+                rows = Model.browse(batch_ids).read(fields_list)
+                if converter:
+                    rows = converter(rows)
+                result.write(b''.join(serializer.dumps(row) + b'\n' for row in rows))
+                done += len(batch_ids)
+                self._report_progress(done, len(ids))
+                # Drop the batch from the record cache
+                Model.env.invalidate_all()
+            result.seek(0)
+            return result.read(), 'application/x-ndjson', 'ndjson'
+
+    def _run_create(self, Model):
+        vals_list = self.payload['values']
+        records = Model.browse()
+        self._report_progress(0, len(vals_list))
+        for batch in split_every(JOB_BATCH_SIZE, vals_list, list):
+            records |= Model.create(batch)
+            self._report_progress(len(records), len(vals_list))
+        return serializer.dumps({'count': len(records), 'ids': records.ids}), 'application/json', 'json'
+
+    def _run_write(self, Model):
+        self._report_progress(0, 1)
+        record = Model.browse(self.payload['id']).exists()
+        if not record:
+            raise ValueError("Not found")
+        record.write(self.payload['values'])
+        return serializer.dumps({'success': True}), 'application/json', 'json'
+
+    @api.model
+    def _retention_days(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('rest_api.job_retention_days', 7))
+
+    @api.model
+    def _gc_jobs(self):
+        """Cron: drops finished jobs and their results after the retention period, fails interrupted ones."""
+        now = fields.Datetime.now()
+        self.sudo().search([('state', '=', 'running'), ('started_at', '<', now - timedelta(days=1))]).write({
+            'state': 'failed',
+            'error': "Interrupted",
+            'finished_at': now,
+        })
+        jobs = self.sudo().search([('create_date', '<', now - timedelta(days=self._retention_days()))])
+        jobs.result_id.unlink()
+        jobs.unlink()
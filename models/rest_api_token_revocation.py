@@ -0,0 +1,24 @@
+from odoo import models, fields, api
+from datetime import datetime
+
+
+class RestApiTokenRevocation(models.Model):
+    _name = 'rest.api.token.revocation'
+    _description = 'REST API Revoked Access Token'
+
+    jti = fields.Char(string="Token ID", required=True, index=True, readonly=True)
+    expires_at = fields.Datetime(string="Expires At", required=True, readonly=True)
+
+    @api.model
+    def _revoke(self, jti, exp):
+        """Revokes token jti, kept until its expiry exp (epoch seconds)."""
+        return self.sudo().create({'jti': jti, 'expires_at': datetime.utcfromtimestamp(exp)})
+
+    @api.model
+    def _active_jtis(self):
+        return self.sudo().search([('expires_at', '>', fields.Datetime.now())]).mapped('jti')
+
+    @api.model
+    def _gc_revocations(self):
+        """Cron: expired tokens are rejected anyway, forget them."""
+        self.sudo().search([('expires_at', '<=', fields.Datetime.now())]).unlink()
@@ -0,0 +1,26 @@
+from odoo import models, fields, api
+from datetime import timedelta
+
+
+class RestApiTombstone(models.Model):
+    _name = 'rest.api.tombstone'
+    _description = 'REST API Deletion Tombstone'
+    _order = 'id'
+
+    model = fields.Char(string="Model", required=True, index=True, readonly=True)
+    res_id = fields.Integer(string="Record ID", required=True, readonly=True)
+
+    @api.model
+    def _record(self, model_name, ids):
+        """Logs the deletion of ids of model_name for the change feed."""
+        return self.sudo().create([{'model': model_name, 'res_id': res_id} for res_id in ids])
+
+    @api.model
+    def _retention_days(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('rest_api.tombstone_retention_days', 30))
+
+    @api.model
+    def _gc_tombstones(self):
+        """Cron: drops tombstones older than the retention period."""
+        limit_date = fields.Datetime.now() - timedelta(days=self._retention_days())
+        self.sudo().search([('create_date', '<', limit_date)]).unlink()
@@ -0,0 +1,10 @@
+from . import test_admission
+from . import test_batch
+from . import test_benchmark
+from . import test_changes
+from . import test_compression
+from . import test_conditional
+from . import test_dispatch
+from . import test_pagination
+from . import test_serializer
+from . import test_tokens
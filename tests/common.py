@@ -0,0 +1,26 @@
+import json
+
+from odoo.tests import HttpCase
+
+
+class RestApiHttpCase(HttpCase):
+    """Calls the REST API as a user authenticated by API key."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env['res.users'].create({
+            'name': 'REST API Test',
+            'login': 'rest_api_test',
+            'password': 'rest_api_test',
+            'groups_id': [(6, 0, [cls.env.ref('base.group_user').id, cls.env.ref('base.group_partner_manager').id])],
+        })
+        cls.api_key = cls.user.action_generate_api_key()
+
+    def _request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {}, **{'X-API-Key': self.api_key})
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        return self.opener.request(method, self.base_url() + path, data=data, headers=headers, timeout=60)
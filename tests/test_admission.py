@@ -0,0 +1,72 @@
+import math
+import tempfile
+from unittest.mock import patch
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools import admission, shared_state
+
+
+@tagged('-at_install', 'post_install')
+class TestAdmission(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.startPatcher(patch.object(shared_state, 'BASE_DIR', base_dir.name))
+
+    def test_request_cost(self):
+        self.assertEqual(admission.request_cost({}, 1000), 1)
+        self.assertEqual(admission.request_cost({'limit': '10000'}, 1000), 10)
+        self.assertEqual(admission.request_cost({'page_size': 5000}, 1000), 5)
+        self.assertEqual(admission.request_cost({'limit': 'many'}, 1000), 1)
+        # The ORM reads every match with a limit of 0
+        self.assertTrue(math.isinf(admission.request_cost({'limit': '0'}, 1000)))
+        self.assertTrue(math.isinf(admission.request_cost({'page_size': '-1'}, 1000)))
+        # A falsy limit falls back on page_size, then on 80 rows, as in dispatch_rest
+        self.assertEqual(admission.request_cost({'limit': 0, 'page_size': 2000}, 1000), 2)
+        # Depth of the dotted expansion, from a string or a list of fields
+        self.assertEqual(admission.request_cost({'limit': 10000, 'fields': 'name,a.b.c'}, 1000), 30)
+        self.assertEqual(admission.request_cost({'limit': 10000, 'fields': '["name", "a.b"]'}, 1000), 20)
+        self.assertEqual(admission.request_cost({'limit': 10000, 'fields': ['a.b.c']}, 1000), 30)
+        # Without limit, streams and unbounded reads read every match
+        self.assertTrue(math.isinf(admission.request_cost({'stream': 'true'}, 1000)))
+        self.assertTrue(math.isinf(admission.request_cost({}, 1000, unbounded=True)))
+        self.assertEqual(admission.request_cost({'limit': 2000}, 1000, unbounded=True), 2)
+
+    def test_rate(self):
+        # Refilled at 0.01 token/s: nothing comes back during the test
+        self.assertEqual(admission.admit('db', 1, 1, 0.01, 2, 0), (None, 0))
+        self.assertEqual(admission.admit('db', 1, 1, 0.01, 2, 0), (None, 0))
+        slot, retry_after = admission.admit('db', 1, 1, 0.01, 2, 0)
+        self.assertIsNone(slot)
+        self.assertGreater(retry_after, 90)
+        # Buckets are per user and per database
+        self.assertEqual(admission.admit('db', 2, 1, 0.01, 2, 0), (None, 0))
+        self.assertEqual(admission.admit('db2', 1, 1, 0.01, 2, 0), (None, 0))
+
+    def test_cost_capped_to_burst(self):
+        self.assertEqual(admission.admit('db', 1, float('inf'), 0.01, 5, 0), (None, 0))
+        self.assertGreater(admission.admit('db', 1, 1, 0.01, 5, 0)[1], 0)
+
+    def test_concurrency(self):
+        slot1, retry_after = admission.admit('db', 1, 1, 0, 0, 2)
+        self.assertTrue(slot1)
+        self.assertEqual(retry_after, 0)
+        slot2, _retry_after = admission.admit('db', 1, 1, 0, 0, 2)
+        self.assertTrue(slot2)
+        self.assertEqual(admission.admit('db', 1, 1, 0, 0, 2), (None, 1))
+        admission.release('db', 1, slot1)
+        slot3, retry_after = admission.admit('db', 1, 1, 0, 0, 2)
+        self.assertTrue(slot3)
+        self.assertEqual(retry_after, 0)
+        # Releasing twice frees nothing more
+        admission.release('db', 1, slot1)
+        self.assertEqual(admission.admit('db', 1, 1, 0, 0, 2), (None, 1))
+
+    def test_slot_timeout(self):
+        # Slots of a killed worker free themselves once their deadline is past
+        with patch.object(admission, 'SLOT_TIMEOUT', -1):
+            self.assertTrue(admission.admit('db', 1, 1, 0, 0, 1)[0])
+            self.assertTrue(admission.admit('db', 1, 1, 0, 0, 1)[0])
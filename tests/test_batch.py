@@ -0,0 +1,73 @@
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import RestApiHttpCase
+
+
+@tagged('-at_install', 'post_install')
+class TestBatch(RestApiHttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create([{'name': f'REST API Batch {i}'} for i in range(2)])
+        cls.missing_id = cls.env['res.partner'].search([], order='id desc', limit=1).id + 1000
+
+    def _batch(self, body, expected_status):
+        response = self._request('POST', '/api/v1/batch', body=body)
+        self.assertEqual(response.status_code, expected_status, response.text)
+        return response.json()
+
+    def _created(self):
+        return self.env['res.partner'].search([('name', '=', 'REST API Batch new')])
+
+    def test_atomic(self):
+        payload = self._batch({'operations': [
+            {'method': 'create', 'model': 'res.partner', 'values': {'name': 'REST API Batch new'}},
+            {'method': 'write', 'model': 'res.partner', 'ids': self.partners[:1].ids, 'values': {'email': 'a@example.com'}},
+            {'method': 'unlink', 'model': 'res.partner', 'id': self.partners[1].id},
+        ]}, 200)
+        self.assertEqual(payload['count'], 3)
+        self.assertEqual(payload['errors'], 0)
+        self.assertEqual([result['status'] for result in payload['results']], [201, 200, 200])
+        self.assertEqual(payload['results'][0]['id'], self._created().id)
+        self.partners.invalidate_recordset()
+        self.assertEqual(self.partners[0].email, 'a@example.com')
+        self.assertFalse(self.partners[1].exists())
+
+    def test_atomic_rollback(self):
+        # The second operation fails: the first one is rolled back
+        payload = self._batch({'operations': [
+            {'method': 'create', 'model': 'res.partner', 'values': {'name': 'REST API Batch new'}},
+            {'method': 'write', 'model': 'res.partner', 'ids': [self.missing_id], 'values': {'name': 'Nope'}},
+            {'method': 'unlink', 'model': 'res.partner', 'ids': self.partners.ids},
+        ]}, 404)
+        self.assertEqual(payload['index'], 1)
+        self.assertFalse(self._created())
+        self.assertEqual(len(self.partners.exists()), 2)
+
+    def test_atomic_rollback_orm_error(self):
+        # Errors raised by the ORM or the database roll back the same way
+        with mute_logger('odoo.addons.rest_api.controllers.api_auth'):
+            payload = self._batch([
+                {'method': 'write', 'model': 'res.partner', 'ids': self.partners[:1].ids, 'values': {'name': 'Renamed'}},
+                {'method': 'create', 'model': 'res.partner', 'values': {'no_such_field': 1}},
+            ], 500)
+        self.assertEqual(payload['index'], 1)
+        self.partners.invalidate_recordset()
+        self.assertEqual(self.partners[0].name, 'REST API Batch 0')
+
+    def test_not_atomic(self):
+        payload = self._batch({'atomic': False, 'operations': [
+            {'method': 'create', 'model': 'res.partner', 'values': {'name': 'REST API Batch new'}},
+            {'method': 'write', 'model': 'res.partner', 'ids': [self.missing_id], 'values': {'name': 'Nope'}},
+            {'method': 'explode', 'model': 'res.partner', 'ids': self.partners.ids},
+            {'method': 'unlink', 'model': 'no.such.model', 'ids': [1]},
+        ]}, 200)
+        self.assertEqual(payload['errors'], 3)
+        self.assertEqual([result['status'] for result in payload['results']], [201, 404, 400, 404])
+        self.assertTrue(self._created())
+
+    def test_invalid(self):
+        self._batch({'operations': 'create'}, 400)
+        self._batch({'operations': [1]}, 400)
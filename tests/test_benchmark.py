@@ -0,0 +1,204 @@
+"""
+Load/benchmark suite of the REST controller.
+
+It is not part of the regular test run, select it with its tag:
+
+    odoo-bin -d bench_db -i rest_api --test-tags /rest_api:rest_api_bench --stop-after-init
+
+Tuning through environment variables:
+    REST_API_BENCH_RECORDS   partners seeded before the run (default 2000)
+    REST_API_BENCH_REQUESTS  requests sent per workload (default 200)
+    REST_API_BENCH_OUTPUT    JSON file the results are written to (default rest_api_bench.json)
+    REST_API_BENCH_CLIENTS   concurrent clients of the login workload (default 8)
+
+Each workload reports req/s, p50/p99 latency and SQL queries per request
+(read from the Server-Timing header). Compare two result files to compare runs.
+
+HttpCase serves every request on the shared test cursor, one at a time: the
+concurrent_login workload measures the per-login cost under a queue of
+clients, not contention between concurrent logins. Measure that against a
+real multi-worker server.
+"""
+import base64
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from odoo import release
+from odoo.tests import HttpCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+# 1x1 transparent PNG, enough to exercise the binary field rewriting
+PIXEL_PNG = base64.b64encode(bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000005a2e2a3d50000000049454e44ae426082'
+))
+SQL_TIMING = re.compile(r'sql;desc="(\d+) queries"')
+
+
+@tagged('-standard', '-at_install', 'post_install', 'rest_api_bench')
+class TestRestApiBenchmark(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.records = int(os.environ.get('REST_API_BENCH_RECORDS', 2000))
+        cls.requests = int(os.environ.get('REST_API_BENCH_REQUESTS', 200))
+        cls.output = os.environ.get('REST_API_BENCH_OUTPUT', 'rest_api_bench.json')
+        cls.clients = int(os.environ.get('REST_API_BENCH_CLIENTS', 8))
+        cls.results = {}
+
+        cls.user = cls.env['res.users'].create({
+            'name': 'REST API Bench',
+            'login': 'rest_api_bench',
+            'password': 'rest_api_bench',
+            'groups_id': [(6, 0, [cls.env.ref('base.group_user').id, cls.env.ref('base.group_partner_manager').id])],
+        })
+        cls.api_key = cls.user.action_generate_api_key()
+
+        # Seed companies with contacts, so dotted expansion has parents and children
+        countries = cls.env['res.country'].search([], limit=20).ids
+        companies = cls.env['res.partner'].create([{
+            'name': f'Bench Company {i}',
+            'is_company': True,
+            'country_id': countries[i % len(countries)] if countries else False,
+            'image_1920': PIXEL_PNG if i % 10 == 0 else False,
+        } for i in range(max(cls.records // 10, 1))])
+        cls.env['res.partner'].create([{
+            'name': f'Bench Contact {i}',
+            'parent_id': companies[i % len(companies)].id,
+            'email': f'contact{i}@bench.example.com',
+        } for i in range(cls.records - len(companies))])
+        cls.partner_ids = companies.ids
+
+    @classmethod
+    def tearDownClass(cls):
+        report = {
+            'meta': {
+                'date': datetime.utcnow().isoformat(),
+                'odoo': release.version,
+                'records': cls.records,
+                'requests': cls.requests,
+                'clients': cls.clients,
+            },
+            'workloads': cls.results,
+        }
+        with open(cls.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        for name, result in sorted(cls.results.items()):
+            _logger.info(
+                "REST API BENCH %-16s %8.1f req/s  p50 %7.1f ms  p99 %7.1f ms  %5.1f queries/req",
+                name, result['req_per_s'], result['p50_ms'], result['p99_ms'], result['sql_queries_per_req'],
+            )
+        _logger.info("REST API BENCH: results written to %s", cls.output)
+        super().tearDownClass()
+
+    def _request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {}, **{'X-API-Key': self.api_key})
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        return self.opener.request(method, self.base_url() + path, data=data, headers=headers, timeout=60)
+
+    def _benchmark(self, name, next_request, requests=None, concurrency=1):
+        """Sends next_request() calls and records the throughput, latencies and SQL queries."""
+        requests = requests or self.requests
+
+        def send(i):
+            request_start = time.perf_counter()
+            response = next_request(i)
+            return time.perf_counter() - request_start, response
+
+        latencies, queries = [], []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for latency, response in pool.map(send, range(requests)):
+                latencies.append(latency)
+                self.assertLess(response.status_code, 400, f"{name}: {response.status_code} {response.text[:200]}")
+                match = SQL_TIMING.search(response.headers.get('Server-Timing', ''))
+                if match:
+                    queries.append(int(match.group(1)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        self.results[name] = {
+            'requests': requests,
+            'req_per_s': requests / elapsed,
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'p99_ms': latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+            'sql_queries_per_req': sum(queries) / len(queries) if queries else 0.0,
+        }
+
+    def test_auth_only(self):
+        # Cached metadata answered with a 304: what is left is mostly authentication
+        etag = self._request('GET', '/api/v1/res.partner/fields').headers['ETag']
+        self._benchmark('auth_only', lambda i: self._request(
+            'GET', '/api/v1/res.partner/fields', headers={'If-None-Match': etag}))
+
+    def test_concurrent_login(self):
+        # Mobile clients re-logging in at shift change; no shared session between clients.
+        # The test server serializes them (see the module docstring)
+        credentials = json.dumps({'login': 'rest_api_bench', 'password': 'rest_api_bench', 'db': self.env.cr.dbname})
+        self._benchmark('concurrent_login', lambda i: requests.post(
+            self.base_url() + '/api/login', data=credentials,
+            headers={'Content-Type': 'application/json'}, timeout=60,
+        ), concurrency=self.clients)
+
+    def test_list_pagination(self):
+        pages = max(self.records // 80, 1)
+        self._benchmark('list_page', lambda i: self._request(
+            'GET', f'/api/v1/res.partner?fields=["name","email"]&limit=80&page={i % pages + 1}'))
+
+        state = {'cursor': ''}
+
+        def next_page(i):
+            response = self._request(
+                'GET', f'/api/v1/res.partner?fields=["name","email"]&limit=80&total=none&cursor={state["cursor"]}')
+            state['cursor'] = response.json()['next_cursor'] or ''
+            return response
+        self._benchmark('list_cursor', next_page)
+
+    def test_deep_expansion(self):
+        fields = '["name","parent_id.name","parent_id.country_id.name","child_ids.name","child_ids.email"]'
+        self._benchmark('deep_expansion', lambda i: self._request(
+            'GET', f'/api/v1/res.partner?fields={fields}&limit=80&domain=[["is_company","=",true]]'))
+
+    def test_composite_query(self):
+        # One screen: companies, their contacts and countries, and a count, in one round-trip
+        queries = {'queries': {
+            'companies': {'model': 'res.partner', 'domain': [['is_company', '=', True]], 'fields': ['name', 'country_id'],
+                          'limit': 20},
+            'contacts': {'model': 'res.partner', 'domain': [['parent_id', 'in', '$companies.ids']],
+                         'fields': ['name', 'email', 'parent_id'], 'limit': 200},
+            'countries': {'model': 'res.country', 'domain': [['id', 'in', '$companies.country_id']], 'fields': ['name']},
+            'contact_count': {'model': 'res.partner', 'domain': [['is_company', '=', False]], 'count': True},
+        }}
+        self._benchmark('composite_query', lambda i: self._request('POST', '/api/v1/query', body=queries))
+
+    def test_image_url(self):
+        self._benchmark('image_url', lambda i: self._request(
+            'GET', '/api/v1/res.partner?fields=["name","image_128"]&image_url=true&limit=80'))
+
+    def test_single_get(self):
+        ids = self.partner_ids
+        self._benchmark('single_get', lambda i: self._request(
+            'GET', f'/api/v1/res.partner/{ids[i % len(ids)]}?fields=["name","email","country_id"]'))
+
+    def test_bulk_write(self):
+        batch = 100
+        self._benchmark('bulk_create', lambda i: self._request(
+            'POST', '/api/v1/res.partner', body=[{'name': f'Bulk {i}-{j}'} for j in range(batch)]),
+            requests=max(self.requests // 10, 1))
+        ids = self.partner_ids
+        self._benchmark('batch_write', lambda i: self._request('POST', '/api/v1/batch', body={'operations': [
+            {'method': 'write', 'model': 'res.partner', 'id': ids[(i + j) % len(ids)], 'values': {'comment': f'Batch {i}'}}
+            for j in range(batch)
+        ]}), requests=max(self.requests // 10, 1))
@@ -0,0 +1,152 @@
+import base64
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from ..controllers.api_auth import ApiAuthController
+from .common import RestApiHttpCase
+
+
+@tagged('-at_install', 'post_install')
+class TestChangeFeed(RestApiHttpCase):
+    """
+    The test transaction never commits, and the feed only returns rows dated
+    before the transaction start (see _changes_horizon): the tests date their
+    rows in the past explicitly.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.now = cls.env.cr.now()
+        cls.start = cls.now - timedelta(hours=2)
+        # Token position between the existing tags and the tags of the tests
+        cls.since = cls._token(cls.start + timedelta(minutes=1), 0, cls.start + timedelta(minutes=1), 0)
+        Category = cls.env['res.partner.category']
+        # Existing tags come first, before the tags of the tests
+        cls._set_dates(Category.with_context(active_test=False).search([]), cls.start)
+        cls.tags = Category.create([{'name': f'REST API Changes {i}'} for i in range(4)])
+        base = cls.now - timedelta(hours=1)
+        # Two tags written at the same time: paged by id
+        for tag, date in zip(cls.tags, [base, base, base + timedelta(seconds=1), base + timedelta(seconds=2)]):
+            cls._set_dates(tag, date)
+
+    @classmethod
+    def _set_dates(cls, records, date):
+        cls.env.flush_all()
+        cls.env.cr.execute(SQL(
+            "UPDATE %s SET write_date = %s, create_date = %s WHERE id IN %s",
+            SQL.identifier(records._table), date, date, tuple(records.ids) or (0,),
+        ))
+        records.invalidate_recordset(['write_date', 'create_date'])
+
+    @classmethod
+    def _token(cls, *values):
+        return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+    def _changes(self, since=None, limit=2):
+        path = f'/api/v1/res.partner.category/changes?fields=["name"]&limit={limit}'
+        if since:
+            path += f'&since={since}'
+        response = self._request('GET', path)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def _sync(self, since=None, limit=2):
+        """Pages through the feed until has_more is false: (changed ids, deleted ids, last token)."""
+        changed, deleted = [], []
+        while True:
+            payload = self._changes(since, limit)
+            changed += [row['id'] for row in payload['changed']]
+            deleted += payload['deleted']
+            since = payload['next_token']
+            if not payload['has_more']:
+                return changed, deleted, since
+
+    def test_paging(self):
+        changed, _deleted, token = self._sync()
+        # Every tag once, ordered by (write_date, id), the tags of the test last
+        self.assertEqual(len(changed), len(set(changed)))
+        self.assertEqual(changed[-4:], self.tags.ids)
+        # Nothing new since the last token
+        self.assertEqual(self._sync(token)[:2], ([], []))
+
+        self._set_dates(self.tags[1], self.now - timedelta(minutes=30))
+        self.assertEqual(self._sync(token)[0], self.tags[1].ids)
+
+    def test_held_back(self):
+        _changed, _deleted, token = self._sync()
+        # Written by the running transaction: not visible before it ends
+        self.tags[0].name = 'Renamed'
+        self.env.flush_all()
+        self.assertEqual(self._sync(token)[0], [])
+
+    def test_horizon(self):
+        # A transaction started before the last two tags were written is still running
+        horizon = self.tags[2].write_date
+        with patch.object(ApiAuthController, '_changes_horizon', return_value=horizon):
+            changed, _deleted, token = self._sync(self.since)
+        self.assertEqual(changed, self.tags[:2].ids)
+        # It ended: the held back tags come with the next call
+        self.assertEqual(self._sync(token)[0], self.tags[2:].ids)
+
+    def test_deleted(self):
+        other = self.env['res.partner'].create({'name': 'REST API Changes partner'})
+        response = self._request('DELETE', f'/api/v1/res.partner.category/{self.tags[0].id}')
+        self.assertEqual(response.status_code, 204, response.text)
+        response = self._request('DELETE', f'/api/v1/res.partner/{other.id}')
+        self.assertEqual(response.status_code, 204, response.text)
+        tombstones = self.env['rest.api.tombstone'].search([
+            '|', '&', ('model', '=', 'res.partner.category'), ('res_id', '=', self.tags[0].id),
+            '&', ('model', '=', 'res.partner'), ('res_id', '=', other.id),
+        ])
+        self.assertEqual(len(tombstones), 2)
+
+        # Dated after the token, but written by the running transaction: held back
+        since = self.since
+        self.assertEqual(self._sync(since)[1], [])
+
+        self._set_dates(tombstones, self.now - timedelta(minutes=30))
+        _changed, deleted, token = self._sync(since)
+        self.assertEqual(deleted, self.tags[0].ids)
+        self.assertEqual(self._sync(token)[1], [])
+
+    def test_first_sync_skips_deletions(self):
+        self.env['rest.api.tombstone']._record('res.partner.category', [self.tags[0].id])
+        self._set_dates(self.env['rest.api.tombstone'].search([('res_id', '=', self.tags[0].id)]),
+                        self.now - timedelta(minutes=30))
+        self.assertEqual(self._sync()[1], [])
+
+    def test_legacy_token(self):
+        # Tokens of the first version: [watermark, last id, last tombstone id]
+        Tombstone = self.env['rest.api.tombstone']
+        last_tombstone = Tombstone.search([], order='id desc', limit=1).id or 0
+        tombstone = Tombstone._record('res.partner.category', [self.tags[0].id])
+        self._set_dates(tombstone, self.start - timedelta(hours=1))
+        changed, deleted, token = self._sync(self._token(self.start + timedelta(minutes=1), 0, last_tombstone))
+        self.assertEqual(changed, self.tags.ids)
+        # Without a date watermark, tombstones are picked by id whatever their date
+        self.assertEqual(deleted, self.tags[0].ids)
+        self.assertEqual(len(json.loads(base64.urlsafe_b64decode(token))), 4)
+
+    def test_gone(self):
+        since = self._token(self.now - timedelta(days=31), 0, self.now - timedelta(days=31), 0)
+        response = self._request('GET', f'/api/v1/res.partner.category/changes?since={since}')
+        self.assertEqual(response.status_code, 410, response.text)
+        response = self._request('GET', '/api/v1/res.partner.category/changes?since=garbage')
+        self.assertEqual(response.status_code, 400, response.text)
+
+    def test_cascade_deleted(self):
+        # Bank accounts go with their partner through an ondelete='cascade' foreign key
+        self.env['ir.config_parameter'].set_param('rest_api.tombstone_models', 'res.partner.bank')
+        partner = self.env['res.partner'].create({'name': 'REST API Changes holder'})
+        bank = self.env['res.partner.bank'].create({'partner_id': partner.id, 'acc_number': 'REST-API-0001'})
+        partner.unlink()
+        self.assertFalse(bank.exists())
+        tombstones = self.env['rest.api.tombstone'].search([('model', '=', 'res.partner.bank')])
+        self.assertEqual(tombstones.mapped('res_id'), bank.ids)
+        # The partner itself is not tracked
+        self.assertFalse(self.env['rest.api.tombstone'].search([('model', '=', 'res.partner'), ('res_id', '=', partner.id)]))
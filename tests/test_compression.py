@@ -0,0 +1,56 @@
+import gzip
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools import compression
+
+
+@tagged('-at_install', 'post_install')
+class TestCompression(BaseCase):
+
+    def _httprequest(self, accept_encoding='gzip'):
+        return Request(EnvironBuilder(headers={'Accept-Encoding': accept_encoding}).get_environ())
+
+    def _response(self, body=b'{"name": "Azure"}' * 100, etag='"0123abcd"'):
+        response = Response(body, content_type='application/json')
+        response.headers['ETag'] = etag
+        return response
+
+    def test_compressed(self):
+        response = compression.compress_response(self._response(), self._httprequest(), 1024, 6)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.get_data()), b'{"name": "Azure"}' * 100)
+        self.assertIn('Accept-Encoding', response.vary)
+        # The strong validator names the identity bytes only
+        self.assertEqual(response.headers['ETag'], 'W/"0123abcd"')
+
+    def test_weak_etag_kept(self):
+        response = compression.compress_response(self._response(etag='W/"0123abcd"'), self._httprequest(), 1024, 6)
+        self.assertEqual(response.headers['ETag'], 'W/"0123abcd"')
+
+    def test_identity(self):
+        # Below min_size, or when the client accepts no supported encoding
+        response = compression.compress_response(self._response(body=b'{}'), self._httprequest(), 1024, 6)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['ETag'], '"0123abcd"')
+        response = compression.compress_response(self._response(), self._httprequest('identity'), 1024, 6)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['ETag'], '"0123abcd"')
+
+    def test_ranges_untouched(self):
+        response = self._response()
+        response.headers['Accept-Ranges'] = 'bytes'
+        response = compression.compress_response(response, self._httprequest(), 1024, 6)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['ETag'], '"0123abcd"')
+
+    def test_streamed(self):
+        response = Response(iter([b'{"a": 1}\n'] * 3), content_type='application/x-ndjson')
+        response.headers['ETag'] = '"0123abcd"'
+        response = compression.compress_response(response, self._httprequest(), 1024, 6)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.response)), b'{"a": 1}\n' * 3)
+        self.assertEqual(response.headers['ETag'], 'W/"0123abcd"')
@@ -0,0 +1,51 @@
+import json
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from .common import RestApiHttpCase
+
+
+@tagged('-at_install', 'post_install')
+class TestConditional(RestApiHttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.country = cls.env.ref('base.be')
+        cls.partner = cls.env['res.partner'].create({'name': 'REST API Conditional', 'country_id': cls.country.id})
+        # Countries written before the test transaction: a write now moves their last date
+        cls.env.flush_all()
+        cls.env.cr.execute(SQL("UPDATE res_country SET write_date = %s", cls.env.cr.now() - timedelta(days=1)))
+        cls.env.invalidate_all()
+
+    def _get(self, path, fields, etag=None):
+        params = {'fields': json.dumps(fields)}
+        if path == '/api/v1/res.partner':
+            params['domain'] = json.dumps([['id', '=', self.partner.id]])
+        headers = {'If-None-Match': etag} if etag else {}
+        return self._request('GET', f'{path}?{urlencode(params)}', headers=headers)
+
+    def _assert_validators(self, path, fields):
+        response = self._get(path, fields)
+        self.assertEqual(response.status_code, 200, response.text)
+        etag = response.headers['ETag']
+        self.assertEqual(self._get(path, fields, etag).status_code, 304)
+
+        # The payload carries the country name: renaming the country changes it
+        self.country.name = f'{self.country.name} (renamed)'
+        self.env.flush_all()
+        response = self._get(path, fields, etag)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_many2one_display_name(self):
+        self._assert_validators('/api/v1/res.partner', ['name', 'country_id'])
+
+    def test_expanded_relation(self):
+        self._assert_validators('/api/v1/res.partner', ['name', 'country_id.code', 'country_id.name'])
+
+    def test_single_record(self):
+        self._assert_validators(f'/api/v1/res.partner/{self.partner.id}', ['name', 'country_id'])
@@ -0,0 +1,42 @@
+from odoo.tests import tagged
+
+from .common import RestApiHttpCase
+
+
+@tagged('-at_install', 'post_install')
+class TestDispatch(RestApiHttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create([
+            {'name': f'REST API Dispatch {i}', 'email': f'dispatch{i}@example.com'} for i in range(3)
+        ])
+
+    def test_list(self):
+        # A readonly route: its predicate is called with the controller, the rule and the args
+        response = self._request('GET', '/api/v1/res.partner?fields=["name","email"]'
+                                        '&domain=[["name","=like","REST API Dispatch %"]]&order=id')
+        self.assertEqual(response.status_code, 200, response.text)
+        payload = response.json()
+        self.assertEqual(payload['total'], 3)
+        self.assertEqual([row['id'] for row in payload['results']], self.partners.ids)
+        self.assertEqual(payload['results'][0]['email'], 'dispatch0@example.com')
+
+    def test_read_your_writes(self):
+        response = self._request('GET', f'/api/v1/res.partner/{self.partners[0].id}?fields=["name"]',
+                                 headers={'X-Read-Your-Writes': '1'})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['name'], 'REST API Dispatch 0')
+
+    def test_write(self):
+        # Writes go through the same predicate and stay on the read-write cursor
+        response = self._request('PUT', f'/api/v1/res.partner/{self.partners[0].id}', body={'name': 'Renamed'})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.partners.invalidate_recordset(['name'])
+        self.assertEqual(self.partners[0].name, 'Renamed')
+
+    def test_aggregate(self):
+        response = self._request('GET', '/api/v1/res.partner/aggregate?domain=[["name","=like","REST API Dispatch %"]]')
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['groups'][0]['__count'], 3)
@@ -0,0 +1,63 @@
+import json
+from urllib.parse import urlencode
+
+from odoo.tests import tagged
+
+from .common import RestApiHttpCase
+
+
+@tagged('-at_install', 'post_install')
+class TestPagination(RestApiHttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create([{'name': f'REST API Page {i}'} for i in range(5)])
+
+    def _list(self, expected_status=200, **params):
+        params = dict({'domain': json.dumps([['id', 'in', self.partners.ids]]), 'fields': '["name"]'}, **params)
+        response = self._request('GET', '/api/v1/res.partner?' + urlencode(params))
+        self.assertEqual(response.status_code, expected_status, response.text)
+        return response.json()
+
+    def _pages(self, **params):
+        """Follows next_cursor from the first page: ids of every page."""
+        pages, cursor = [], ''
+        while True:
+            payload = self._list(cursor=cursor, **params)
+            pages.append([row['id'] for row in payload['results']])
+            cursor = payload['next_cursor']
+            if not cursor:
+                return pages
+
+    def test_cursor(self):
+        ids = self.partners.ids
+        self.assertEqual(self._pages(limit=2), [ids[:2], ids[2:4], ids[4:]])
+        self.assertEqual(self._pages(limit=5), [ids])
+
+    def test_cursor_order_ties(self):
+        # Created in one transaction: same create_date, the id breaks ties
+        ids = self.partners.ids[::-1]
+        self.assertEqual(self._pages(limit=2, order='create_date desc'), [ids[:2], ids[2:4], ids[4:]])
+
+    def test_cursor_order_optional_field(self):
+        # A NULL value would end the page sequence: only required fields
+        self._list(400, cursor='', order='email')
+        self._list(400, cursor='', order='parent_id')
+        self._list(400, cursor='garbage', limit=2)
+
+    def test_totals(self):
+        self.assertEqual(self._list(limit=2)['total'], 5)
+        self.assertEqual(self._list(limit=2)['total_pages'], 3)
+        payload = self._list(limit=2, total='none')
+        self.assertIsNone(payload['total'])
+        self.assertIsNone(payload['total_pages'])
+        self.assertEqual(payload['count'], 2)
+        self.assertIsInstance(self._list(limit=2, total='estimate')['total'], int)
+        self.assertEqual(self._list(cursor='', limit=2)['total'], 5)
+        self._list(400, total='some')
+
+    def test_offset_pages(self):
+        ids = self.partners.ids
+        self.assertEqual([row['id'] for row in self._list(limit=2, page=2, order='id')['results']], ids[2:4])
+        self.assertEqual([row['id'] for row in self._list(limit=2, offset=3, order='id')['results']], ids[3:])
@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from unittest.mock import patch
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools import serializer
+
+
+@tagged('-at_install', 'post_install')
+class TestSerializer(BaseCase):
+
+    def test_dumps(self):
+        data = {
+            'id': 7,
+            'name': 'Azure',
+            'tags': [1, 2],
+            'date': date(2024, 1, 31),
+            'write_date': datetime(2024, 1, 31, 12, 30, 5),
+            'image': b'aGVsbG8=',
+            'active': False,
+        }
+        expected = (
+            b'{"id":7,"name":"Azure","tags":[1,2],"date":"2024-01-31",'
+            b'"write_date":"2024-01-31 12:30:05","image":"aGVsbG8=","active":false}'
+        )
+        self.assertEqual(serializer.dumps(data), expected)
+        # The standard library fallback produces the same bytes
+        with patch.object(serializer, 'orjson', None):
+            self.assertEqual(serializer.dumps(data), expected)
+
+    def test_dumps_special_values(self):
+        # NaN and infinities are not JSON: null; text is UTF-8, not escaped
+        data = {'ratio': float('nan'), 'bounds': [float('-inf'), 1.5, float('inf')], 'name': 'Café'}
+        expected = '{"ratio":null,"bounds":[null,1.5,null],"name":"Café"}'.encode()
+        self.assertEqual(serializer.dumps(data), expected)
+        with patch.object(serializer, 'orjson', None):
+            self.assertEqual(serializer.dumps(data), expected)
+
+    def test_no_converter(self):
+        self.assertIsNone(serializer.row_converter((('name', 'char'), ('count', 'integer'))))
+        self.assertIsNone(serializer.row_converter((('partner_id', 'many2one'),), 'pair'))
+
+    def test_many2one_shapes(self):
+        field_types = (('partner_id', 'many2one'),)
+        rows = [{'partner_id': (3, 'Azure')}, {'partner_id': False}]
+        to_id = serializer.row_converter(field_types, 'id')
+        self.assertEqual(to_id([dict(row) for row in rows]), [{'partner_id': 3}, {'partner_id': False}])
+        to_object = serializer.row_converter(field_types, 'object')
+        self.assertEqual(to_object([dict(row) for row in rows]), [
+            {'partner_id': {'id': 3, 'display_name': 'Azure'}},
+            {'partner_id': False},
+        ])
+
+    def test_type_converters(self):
+        convert = serializer.row_converter((
+            ('date', 'date'),
+            ('write_date', 'datetime'),
+            ('image', 'binary'),
+            ('name', 'char'),
+        ))
+        rows = convert([{
+            'date': date(2024, 1, 31),
+            'write_date': datetime(2024, 1, 31, 12, 30, 5),
+            'image': b'aGVsbG8=',
+            'name': 'Azure',
+        }, {
+            'date': False,
+            'write_date': None,
+            'image': False,
+            'name': False,
+        }])
+        self.assertEqual(rows, [{
+            'date': '2024-01-31',
+            'write_date': '2024-01-31 12:30:05',
+            'image': 'aGVsbG8=',
+            'name': 'Azure',
+        }, {
+            'date': False,
+            'write_date': None,
+            'image': False,
+            'name': False,
+        }])
+
+    def test_converter_cached(self):
+        field_types = (('date', 'date'),)
+        self.assertIs(serializer.row_converter(field_types), serializer.row_converter(field_types))
@@ -0,0 +1,91 @@
+import base64
+import json
+import time
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools.misc import hmac
+
+from ..tools import tokens
+
+
+@tagged('-at_install', 'post_install')
+class TestAccessTokens(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env['res.users'].create({
+            'name': 'REST API Token',
+            'login': 'rest_api_token',
+        })
+        cls.user.action_generate_api_key()
+
+    def _sign(self, payload):
+        """A token of payload with a valid signature, as issue() would make it."""
+        body = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+        return f'{body}.{hmac(self.env(su=True), tokens.HMAC_SCOPE, body)}'
+
+    def test_is_token(self):
+        token, _payload = tokens.issue(self.user, 60)
+        self.assertTrue(tokens.is_token(token))
+        self.assertFalse(tokens.is_token(self.user.rest_api_key))
+
+    def test_issue_validate(self):
+        token, payload = tokens.issue(self.user, 60)
+        self.assertEqual(tokens.validate(self.env, token), self.user.id)
+        self.assertEqual(tokens.decode(self.env, token), payload)
+        self.assertEqual(payload['db'], self.env.cr.dbname)
+
+    def test_bad_signature(self):
+        token, payload = tokens.issue(self.user, 60)
+        body, _, signature = token.rpartition('.')
+        tampered = signature[:-1] + ('0' if signature[-1] != '0' else '1')
+        self.assertIsNone(tokens.decode(self.env, f'{body}.{tampered}'))
+        self.assertFalse(tokens.validate(self.env, f'{body}.{tampered}'))
+        # A payload changed without its signature
+        forged = base64.urlsafe_b64encode(json.dumps(dict(payload, uid=1)).encode()).decode().rstrip('=')
+        self.assertFalse(tokens.validate(self.env, f'{forged}.{signature}'))
+        self.assertFalse(tokens.validate(self.env, f'.{signature}'))
+
+    def test_expired(self):
+        token, payload = tokens.issue(self.user, -1)
+        self.assertEqual(tokens.decode(self.env, token), payload)
+        self.assertFalse(tokens.validate(self.env, token))
+
+    def test_other_database(self):
+        _token, payload = tokens.issue(self.user, 60)
+        token = self._sign(dict(payload, db=self.env.cr.dbname + '_other'))
+        self.assertFalse(tokens.validate(self.env, token))
+        self.assertEqual(tokens.validate(self.env, self._sign(payload)), self.user.id)
+
+    def test_revoke(self):
+        token, payload = tokens.issue(self.user, 60)
+        other_token, _other_payload = tokens.issue(self.user, 60)
+        tokens.revoke(self.env, payload)
+        self.assertIn(payload['jti'], tokens.revoked(self.env))
+        self.assertFalse(tokens.validate(self.env, token))
+        self.assertEqual(tokens.validate(self.env, other_token), self.user.id)
+        self.assertIn(payload['jti'], self.env['rest.api.token.revocation']._active_jtis())
+
+    def test_revocation_expiry(self):
+        Revocation = self.env['rest.api.token.revocation']
+        Revocation._revoke('expired', int(time.time()) - 1)
+        Revocation._revoke('active', int(time.time()) + 60)
+        active_jtis = Revocation._active_jtis()
+        self.assertIn('active', active_jtis)
+        self.assertNotIn('expired', active_jtis)
+        Revocation._gc_revocations()
+        self.assertEqual(Revocation.search([('jti', 'in', ['expired', 'active'])]).mapped('jti'), ['active'])
+
+    def test_key_rotation(self):
+        token, _payload = tokens.issue(self.user, 60)
+        self.assertEqual(tokens.validate(self.env, token), self.user.id)
+        self.user.action_generate_api_key()
+        self.assertFalse(tokens.validate(self.env, token))
+        new_token, _payload = tokens.issue(self.user, 60)
+        self.assertEqual(tokens.validate(self.env, new_token), self.user.id)
+
+    def test_archived_user(self):
+        token, _payload = tokens.issue(self.user, 60)
+        self.user.active = False
+        self.assertFalse(tokens.validate(self.env, token))
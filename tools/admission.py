@@ -0,0 +1,114 @@
+"""
+Admission control of API users, shared by the workers of one server.
+
+Each user has a token bucket refilled at `rate` tokens per second up to
+`burst`, a request takes `cost` tokens (see request_cost). In-flight requests
+are kept as deadlines rather than a counter, so the slots of a killed worker
+free themselves after SLOT_TIMEOUT seconds. The state of a user is a small
+JSON file under shared_state, updated under an exclusive flock.
+"""
+import fcntl
+import json
+import math
+import os
+import re
+import time
+
+from . import shared_state
+
+# Seconds after which an in-flight slot that was never released is dropped
+SLOT_TIMEOUT = 600
+# Rows assumed for a read without limit that returns every match (stream,
+# export, async job): the request then costs a full bucket
+UNBOUNDED_ROWS = float('inf')
+FIELD_SEPARATORS = re.compile(r'[\s,\[\]"\']+')
+
+
+def request_cost(params, rows_per_token, unbounded=False):
+    """
+    Tokens taken by a read with params (query string and JSON body merged):
+    the rows it may read times the depth of its dotted field expansion, per
+    rows_per_token rows, at least 1. unbounded: without limit, every matching
+    row is read. So does a limit of "0" or less, which the ORM ignores.
+    """
+    limit = params.get('limit') or params.get('page_size')
+    if limit:
+        try:
+            rows = int(limit)
+        except (TypeError, ValueError):
+            rows = 0  # rejected by the endpoint
+        else:
+            if rows <= 0:
+                rows = UNBOUNDED_ROWS
+    elif unbounded or str(params.get('stream', '')).lower() == 'true':
+        rows = UNBOUNDED_ROWS
+    else:
+        rows = 80
+    fields = params.get('fields') or ''
+    names = fields if isinstance(fields, list) else FIELD_SEPARATORS.split(str(fields))
+    depth = 1 + max((str(name).count('.') for name in names), default=0)
+    return max(1, rows * depth / rows_per_token)
+
+
+def _open(dbname, uid):
+    fd = os.open(shared_state.path(dbname, 'admission', str(uid)), os.O_RDWR | os.O_CREAT, 0o600)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    return fd
+
+
+def _read(fd):
+    try:
+        return json.loads(os.pread(fd, 65536, 0) or b'{}')
+    except ValueError:
+        return {}
+
+
+def _write(fd, state):
+    data = json.dumps(state).encode()
+    os.ftruncate(fd, 0)
+    os.pwrite(fd, data, 0)
+
+
+def admit(dbname, uid, cost, rate, burst, max_concurrent):
+    """
+    Takes cost tokens and an in-flight slot for uid, rate or max_concurrent
+    being 0 when not limited. Returns (slot, retry_after): slot is the handle
+    to give back to release() (None when there is none to release),
+    retry_after the seconds to wait before retrying, 0 when admitted.
+    """
+    now = time.time()
+    fd = _open(dbname, uid)
+    try:
+        state = _read(fd)
+        inflight = [deadline for deadline in state.get('inflight', []) if deadline > now]
+        if max_concurrent and len(inflight) >= max_concurrent:
+            return None, 1
+
+        tokens = 0.0
+        if rate:
+            tokens = min(burst, state.get('tokens', burst) + (now - state.get('at', now)) * rate)
+            cost = min(cost, burst)
+            if tokens < cost:
+                return None, math.ceil((cost - tokens) / rate)
+            tokens -= cost
+
+        slot = None
+        if max_concurrent:
+            slot = now + SLOT_TIMEOUT
+            inflight.append(slot)
+        _write(fd, {'tokens': tokens, 'at': now, 'inflight': inflight})
+        return slot, 0
+    finally:
+        os.close(fd)
+
+
+def release(dbname, uid, slot):
+    """Gives back the in-flight slot returned by admit()."""
+    fd = _open(dbname, uid)
+    try:
+        state = _read(fd)
+        if slot in state.get('inflight', []):
+            state['inflight'].remove(slot)
+            _write(fd, state)
+    finally:
+        os.close(fd)
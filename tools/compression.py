@@ -0,0 +1,137 @@
+"""
+Accept-Encoding negotiated compression of REST API responses.
+
+gzip is always available, brotli and zstd are offered when the 'brotli' and
+'zstandard' packages are installed. Streamed bodies are compressed chunk by
+chunk and flushed after every chunk, so nothing is buffered.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing, binaries (images, files) usually are already
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(min(max(level, 1), 9), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=min(max(level, 0), 11))
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=min(max(level, 1), 22)).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encodings():
+    """Supported encodings, most efficient first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def negotiate(httprequest):
+    """The encoding to use for the response to httprequest, None for identity."""
+    return httprequest.accept_encodings.best_match(available_encodings())
+
+
+def compressor(encoding, level):
+    return {'gzip': _Gzip, 'br': _Brotli, 'zstd': _Zstd}[encoding](level)
+
+
+def compress(data, encoding, level):
+    """Compresses a whole body at once."""
+    engine = compressor(encoding, level)
+    return engine.compress(data) + engine.finish()
+
+
+def compress_stream(chunks, encoding, level):
+    """Compresses an iterable body chunk by chunk, flushing after each one."""
+    engine = compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = engine.compress(chunk) + engine.flush()
+        if data:
+            yield data
+    yield engine.finish()
+
+
+def compress_response(response, httprequest, min_size, level):
+    """
+    Compresses response in place when the client accepts an encoding we
+    support and the body is compressible. Streamed bodies are always
+    compressed, buffered ones only from min_size bytes. File responses
+    (direct passthrough, or serving byte ranges) are left alone: their ranges
+    and strong ETag describe the uncompressed content. A strong ETag of a
+    compressed body is made weak, it names the identity bytes only.
+    """
+    content_type = response.headers.get('Content-Type', '')
+    if response.status_code in (204, 206, 304) or 'Content-Encoding' in response.headers:
+        return response
+    if response.direct_passthrough or 'Accept-Ranges' in response.headers:
+        return response
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(httprequest)
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
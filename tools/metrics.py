@@ -0,0 +1,195 @@
+"""
+Per-request timings of the REST API and their aggregation into histograms.
+
+Each worker keeps its histograms in memory and periodically dumps them to a
+file of its own in a shared directory, so the metrics endpoint can sum the
+figures of every worker of the server whichever worker serves the scrape.
+"""
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Minimum delay (seconds) between two dumps of a worker's metrics
+FLUSH_INTERVAL = 5
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'odoo_rest_api_metrics')
+
+
+class RequestTimer:
+    """Collects the phase durations and SQL figures of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.model = None
+        self.details = {}
+        self.phases = {}  # name: [duration, query count, query time]
+        self._thread = threading.current_thread()
+        # Wall-clock start of the HTTP request, as recorded by Odoo when available
+        self.started_at = getattr(self._thread, 'perf_t0', None) or time.time()
+        self._sql_start = self._sql()
+
+    def _sql(self):
+        # Odoo resets these counters at the start of every HTTP request
+        return getattr(self._thread, 'query_count', 0), getattr(self._thread, 'query_time', 0.0)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        queries, query_time = self._sql()
+        try:
+            yield
+        finally:
+            end_queries, end_query_time = self._sql()
+            totals = self.phases.setdefault(name, [0.0, 0, 0.0])
+            totals[0] += time.perf_counter() - start
+            totals[1] += end_queries - queries
+            totals[2] += end_query_time - query_time
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def sql(self):
+        """(query count, query time) since the timer started."""
+        queries, query_time = self._sql()
+        return queries - self._sql_start[0], query_time - self._sql_start[1]
+
+    def server_timing(self):
+        """Value of the Server-Timing header, durations in milliseconds."""
+        entries = [f'{name};dur={totals[0] * 1000:.1f}' for name, totals in self.phases.items()]
+        queries, query_time = self.sql()
+        entries.append(f'sql;desc="{queries} queries";dur={query_time * 1000:.1f}')
+        entries.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(entries)
+
+
+class MetricsRegistry:
+    """Histograms of request durations and counters per (model, method)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._last_flush = 0.0
+
+    def observe(self, timer, model, method):
+        duration = timer.elapsed()
+        queries, query_time = timer.sql()
+        key = f'{model or "-"}|{method}'
+        with self._lock:
+            series = self._series.setdefault(key, {
+                'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0,
+                'queries': 0, 'query_time': 0.0, 'phases': {},
+            })
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    series['buckets'][index] += 1
+            series['count'] += 1
+            series['sum'] += duration
+            series['queries'] += queries
+            series['query_time'] += query_time
+            for name, totals in timer.phases.items():
+                series['phases'][name] = series['phases'].get(name, 0.0) + totals[0]
+        if time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Dumps this worker's metrics to its file in METRICS_DIR."""
+        self._last_flush = time.monotonic()
+        with self._lock:
+            payload = json.dumps(self._series)
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+            with open(path + '.tmp', 'w') as f:
+                f.write(payload)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            _logger.warning("REST API: Cannot write metrics to %s", METRICS_DIR, exc_info=True)
+
+    def collect(self):
+        """Sums the metrics dumped by every worker, this one included."""
+        self.flush()
+        merged = {}
+        try:
+            filenames = os.listdir(METRICS_DIR)
+        except OSError:
+            filenames = []
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, filename)) as f:
+                    worker_series = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for key, series in worker_series.items():
+                total = merged.setdefault(key, {
+                    'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0,
+                    'queries': 0, 'query_time': 0.0, 'phases': {},
+                })
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], series['buckets'])]
+                for name in ('count', 'sum', 'queries', 'query_time'):
+                    total[name] += series[name]
+                for name, value in series['phases'].items():
+                    total['phases'][name] = total['phases'].get(name, 0.0) + value
+        return merged
+
+    def prometheus(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = [
+            '# HELP rest_api_request_duration_seconds Duration of REST API requests.',
+            '# TYPE rest_api_request_duration_seconds histogram',
+        ]
+        merged = sorted(self.collect().items())
+        for key, series in merged:
+            labels = _labels(key)
+            for bound, count in zip(BUCKETS, series['buckets']):
+                lines.append(f'rest_api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'rest_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series["count"]}')
+            lines.append(f'rest_api_request_duration_seconds_sum{{{labels}}} {series["sum"]:.6f}')
+            lines.append(f'rest_api_request_duration_seconds_count{{{labels}}} {series["count"]}')
+        lines += [
+            '# HELP rest_api_sql_queries_total SQL queries run by REST API requests.',
+            '# TYPE rest_api_sql_queries_total counter',
+        ]
+        lines += [f'rest_api_sql_queries_total{{{_labels(key)}}} {series["queries"]}' for key, series in merged]
+        lines += [
+            '# HELP rest_api_sql_seconds_total Time spent in SQL by REST API requests.',
+            '# TYPE rest_api_sql_seconds_total counter',
+        ]
+        lines += [f'rest_api_sql_seconds_total{{{_labels(key)}}} {series["query_time"]:.6f}' for key, series in merged]
+        lines += [
+            '# HELP rest_api_phase_seconds_total Time spent per phase of REST API requests.',
+            '# TYPE rest_api_phase_seconds_total counter',
+        ]
+        for key, series in merged:
+            for name, value in sorted(series['phases'].items()):
+                lines.append(f'rest_api_phase_seconds_total{{{_labels(key)},phase="{name}"}} {value:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label_value(value):
+    """Escapes a label value as the exposition format requires."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(key):
+    model, method = key.rsplit('|', 1)
+    return f'model="{_label_value(model)}",method="{_label_value(method)}"'
+
+
+def request_timer(request):
+    """The timer of the current request, started on first use."""
+    timer = getattr(request, 'rest_api_timer', None)
+    if timer is None:
+        timer = request.rest_api_timer = RequestTimer()
+    return timer
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,56 @@
+"""
+Change notifications of the subscribe endpoint, over PostgreSQL LISTEN/NOTIFY.
+
+Writers queue them in precommit, so they are only delivered when the
+transaction commits, and only for the models somebody subscribed to lately
+(see shared_state.subscribe). A waiting request listens on a dedicated
+connection of its database.
+"""
+import json
+import select
+
+from odoo import sql_db
+from odoo.tools import SQL, split_every
+
+CHANNEL = 'rest_api_changes'
+# Ids per notification, keeps payloads well under the 8000 bytes NOTIFY limit
+IDS_PER_NOTIFICATION = 500
+
+
+def send(cr, changes):
+    """Notifies changes, {(model name, operation): ids}, from the transaction of cr."""
+    for (model_name, operation), ids in changes.items():
+        for batch in split_every(IDS_PER_NOTIFICATION, sorted(ids), list):
+            payload = json.dumps({'model': model_name, 'op': operation, 'ids': batch})
+            cr.execute(SQL("SELECT pg_notify(%s, %s)", CHANNEL, payload))
+
+
+class Listener:
+    """Dedicated connection listening to the change notifications of dbname."""
+
+    def __init__(self, dbname):
+        self._cr = sql_db.db_connect(dbname).cursor()
+        # Pooled connection: drop whatever a previous listener left behind
+        self._cr._cnx.notifies.clear()
+        self._cr.execute(SQL("LISTEN %s", SQL.identifier(CHANNEL)))
+        self._cr.commit()
+
+    def wait(self, timeout):
+        """Notifications received within timeout seconds, as dicts; empty on timeout."""
+        connection = self._cr._cnx
+        if select.select([connection], [], [], timeout) == ([], [], []):
+            return []
+        connection.poll()
+        received = []
+        while connection.notifies:
+            received.append(json.loads(connection.notifies.pop(0).payload))
+        return received
+
+    def close(self):
+        """Stops listening and gives the connection back to the pool."""
+        try:
+            self._cr.execute(SQL("UNLISTEN %s", SQL.identifier(CHANNEL)))
+            self._cr.commit()
+            self._cr._cnx.notifies.clear()
+        finally:
+            self._cr.close()
@@ -0,0 +1,52 @@
+"""
+In-process cache of REST API responses, bounded in size (LRU) and age (TTL).
+
+Entries are invalidated across workers through tools.shared_state: a write
+committed on any model a response was built from, after the request that
+built it started, makes the entry stale.
+"""
+import collections
+import threading
+import time
+
+from . import shared_state
+
+
+class ResponseCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, dbname, model_names):
+        """
+        The cached (body, headers) of key, None when missing or stale. Call it
+        before reading the data of model_names: their change markers must
+        exist before the read, or changes committed meanwhile would be missed.
+        """
+        changed_at = [shared_state.model_changed_at(dbname, model_name) for model_name in model_names]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        expires, started, _model_names, body, headers = entry
+        if expires < time.time() or any(at >= started for at in changed_at):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return body, headers
+
+    def put(self, key, dbname, started, model_names, body, headers, ttl, max_size):
+        """
+        Stores a response built by a request that started at started (epoch
+        seconds) from the data of model_names, after a get() of key.
+        """
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, started, tuple(model_names), body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+
+cache = ResponseCache()
@@ -0,0 +1,96 @@
+"""
+JSON encoding of REST API payloads.
+
+Values that JSON cannot represent natively are converted per field type by
+row converters compiled once per (field types, options), instead of going
+through a generic fallback for every value. Payloads are encoded with
+orjson when it is installed and with the standard library otherwise; both
+produce the same compact UTF-8 output, NaN and infinities written as null.
+"""
+import functools
+import json
+import math
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shapes a many2one value (id, display_name) can be serialized to
+MANY2ONE_SHAPES = ('pair', 'id', 'object')
+
+
+def _default(value):
+    if isinstance(value, bytes):  # base64 payload of binary fields
+        return value.decode()
+    return str(value)
+
+
+def _finite(data):
+    """data with its NaN and infinite floats replaced by None, as orjson writes them."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_finite(value) for value in data]
+    return data
+
+
+def dumps(data):
+    """Encodes data to JSON bytes."""
+    if orjson is not None:
+        # Datetimes go through _default so both backends format them alike
+        return orjson.dumps(data, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    try:
+        return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode()
+    except ValueError:
+        # NaN / Infinity are not JSON: write null (rare, so checked on failure only)
+        return json.dumps(_finite(data), default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _to_string(value):
+    return str(value)
+
+
+def _binary_to_string(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _many2one_id(value):
+    return value[0] if isinstance(value, tuple) else value
+
+
+def _many2one_object(value):
+    return {'id': value[0], 'display_name': value[1]} if isinstance(value, tuple) else value
+
+
+_MANY2ONE_CONVERTERS = {'id': _many2one_id, 'object': _many2one_object}
+_TYPE_CONVERTERS = {'date': _to_string, 'datetime': _to_string, 'binary': _binary_to_string}
+
+
+@functools.lru_cache(maxsize=1024)
+def row_converter(field_types, many2one='pair'):
+    """
+    Compiles the converter of rows read with field_types, a tuple of
+    (field name, field type). Returns None when no field needs converting.
+    """
+    converters = []
+    for name, field_type in field_types:
+        if field_type == 'many2one' and many2one in _MANY2ONE_CONVERTERS:
+            converters.append((name, _MANY2ONE_CONVERTERS[many2one]))
+        elif field_type in _TYPE_CONVERTERS:
+            converters.append((name, _TYPE_CONVERTERS[field_type]))
+    if not converters:
+        return None
+    converters = tuple(converters)
+
+    def convert(rows):
+        for row in rows:
+            for name, converter in converters:
+                value = row.get(name)
+                if value:  # False / None stay as they are
+                    row[name] = converter(value)
+        return rows
+    return convert
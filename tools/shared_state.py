@@ -0,0 +1,77 @@
+"""
+State shared by the workers of one server through small files.
+
+Files live in /dev/shm when available (memory backed) and in the temporary
+directory otherwise, one sub-directory per database.
+"""
+import os
+import tempfile
+import time
+
+BASE_DIR = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'odoo_rest_api')
+# Seconds change notifications of a model stay on after the last subscribe call
+SUBSCRIPTION_TTL = 3600
+
+
+def path(dbname, *parts):
+    """Path of a shared file of dbname, its directory is created on demand."""
+    directory = os.path.join(BASE_DIR, dbname, *parts[:-1])
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, parts[-1])
+
+
+def model_changed_at(dbname, model_name):
+    """
+    Time (epoch seconds) of the last committed change to model_name that was
+    signaled, 0 when none yet. The marker of a model not signaled yet is
+    created dated 0, so that it does not look like a change.
+    """
+    marker = path(dbname, 'models', model_name)
+    try:
+        return os.stat(marker).st_mtime
+    except FileNotFoundError:
+        pass
+    # Link a ready-made file: a concurrent signal is never overwritten by our date
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(marker))
+    os.close(fd)
+    try:
+        os.utime(tmp, (0, 0))
+        os.link(tmp, marker)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp)
+    return os.stat(marker).st_mtime
+
+
+def signal_model_changes(dbname, model_names):
+    """
+    Marks model_names as changed now. Only models with a marker are
+    signaled: the response cache creates the marker of a model before it
+    reads from it (see model_changed_at), the others have nothing to
+    invalidate.
+    """
+    directory = os.path.join(BASE_DIR, dbname, 'models')
+    if not os.path.isdir(directory):
+        return  # the response cache was never used on dbname
+    for model_name in model_names:
+        try:
+            os.utime(os.path.join(directory, model_name))
+        except FileNotFoundError:
+            pass
+
+
+def subscribe(dbname, model_name):
+    """Turns change notifications of model_name on for SUBSCRIPTION_TTL seconds (see has_subscribers)."""
+    marker = path(dbname, 'subscriptions', model_name)
+    with open(marker, 'a'):
+        os.utime(marker)
+
+
+def has_subscribers(dbname, model_name):
+    """Whether somebody subscribed to the changes of model_name lately."""
+    try:
+        subscribed_at = os.stat(os.path.join(BASE_DIR, dbname, 'subscriptions', model_name)).st_mtime
+    except FileNotFoundError:
+        return False
+    return subscribed_at > time.time() - SUBSCRIPTION_TTL
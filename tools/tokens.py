@@ -0,0 +1,86 @@
+"""
+Short-lived signed access tokens: "<payload>.<signature>".
+
+The payload (base64url JSON) carries the user id, the database, the expiry,
+a token id (jti) and a fingerprint of the user's API key; the signature is
+an HMAC keyed on the database secret. Validating a token is CPU only, apart
+from lookups cached per worker: rotating the user's API key invalidates the
+fingerprint, and revoked token ids are kept in a deny-list that every worker
+reloads from the database every DENY_LIST_REFRESH seconds.
+"""
+import base64
+import json
+import secrets
+import threading
+import time
+
+from odoo.tools import consteq
+from odoo.tools.misc import hmac
+
+HMAC_SCOPE = 'rest_api.access_token'
+# Seconds between two reloads of the deny-list of revoked tokens
+DENY_LIST_REFRESH = 30
+
+_deny_lists = {}  # dbname: (loaded at, set of revoked jti)
+_deny_lists_lock = threading.Lock()
+
+
+def is_token(key):
+    """API keys are hex strings, tokens always contain a dot."""
+    return '.' in key
+
+
+def issue(user, ttl):
+    """Returns (token, payload) for user, valid ttl seconds."""
+    payload = {
+        'uid': user.id,
+        'db': user.env.cr.dbname,
+        'exp': int(time.time()) + ttl,
+        'jti': secrets.token_hex(8),
+        'kfp': user.env['res.users']._rest_api_key_fingerprint(user.id),
+    }
+    body = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+    return f'{body}.{hmac(user.env(su=True), HMAC_SCOPE, body)}', payload
+
+
+def decode(env, token):
+    """The payload of token if its signature is valid (expired or not), None otherwise."""
+    body, _, signature = token.rpartition('.')
+    if not body or not consteq(signature, hmac(env(su=True), HMAC_SCOPE, body)):
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(body + '=' * (-len(body) % 4)))
+    except ValueError:
+        return None
+
+
+def validate(env, token):
+    """The user id carried by token when it is valid and not revoked, False otherwise."""
+    payload = decode(env, token)
+    if not payload or payload['db'] != env.cr.dbname or payload['exp'] < time.time():
+        return False
+    if payload['jti'] in revoked(env):
+        return False
+    # The fingerprint changes when the key is rotated or the user archived
+    if payload['kfp'] != env['res.users']._rest_api_key_fingerprint(payload['uid']):
+        return False
+    return payload['uid']
+
+
+def revoked(env):
+    """Ids of the revoked, not yet expired tokens, reloaded periodically."""
+    dbname = env.cr.dbname
+    loaded_at, jtis = _deny_lists.get(dbname, (0, frozenset()))
+    if time.monotonic() - loaded_at > DENY_LIST_REFRESH:
+        jtis = frozenset(env['rest.api.token.revocation'].sudo()._active_jtis())
+        with _deny_lists_lock:
+            _deny_lists[dbname] = (time.monotonic(), jtis)
+    return jtis
+
+
+def revoke(env, payload):
+    """Adds the token of payload to the deny-list, at once in this worker."""
+    env['rest.api.token.revocation'].sudo()._revoke(payload['jti'], payload['exp'])
+    with _deny_lists_lock:
+        loaded_at, jtis = _deny_lists.get(env.cr.dbname, (0, frozenset()))
+        _deny_lists[env.cr.dbname] = (loaded_at, jtis | {payload['jti']})